@@ -0,0 +1,199 @@
+# backend/__main__.py
+"""
+Production server entry point.
+
+    python -m backend [--workers N] [--host HOST] [--port PORT]
+
+The app is imported once in this (master) process and shared copy-on-write
+with forked uvicorn workers listening on one socket. The master respawns
+workers that die and handles signals:
+
+- SIGHUP: graceful restart, starting a new set of workers before stopping the old
+- SIGTERM / SIGINT: graceful shutdown, killing workers still busy after
+  WORKER_GRACEFUL_TIMEOUT_SECONDS
+
+Workers that keep crashing are respawned with an exponential backoff.
+Because the app is preloaded, code changes need a full restart, not SIGHUP.
+
+Workers default to the CPU count. Checkout holds, idempotency keys and
+availability events are shared through the database (or Redis, for events),
+so any worker can serve any request; the "memory" backends are per process
+and limit the server to one worker.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import uvicorn
+
+from .app.core.config import settings
+from .app.db.migrations import check_schema_version, migrate
+from .app.db.session import engine
+from .main import app
+
+logger = logging.getLogger("backend.server")
+
+RESPAWN_DELAY_SECONDS = 0.5
+# A worker that ran this long is considered healthy and resets the backoff
+HEALTHY_UPTIME_SECONDS = 30.0
+
+
+def _run_worker(config: uvicorn.Config, sock: socket.socket) -> None:
+    # Drop pooled connections inherited from the master without closing
+    # them, since the master owns the underlying sockets
+    engine.dispose(close=False)
+    for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, signal.SIG_DFL)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.children: Dict[int, Tuple[int, float]] = {}  # pid -> (generation, started)
+        self.generation = 0
+        self.crashes = 0  # consecutive early worker failures
+        self.respawn_at = 0.0
+        self._signals: List[int] = []
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                _run_worker(self.config, self.sock)
+            except BaseException:
+                logger.exception("worker crashed")
+                status = 1
+            finally:
+                os._exit(status)
+        self.children[pid] = (self.generation, time.monotonic())
+        logger.info("started worker %s", pid)
+
+    def stop(self, pids: List[int]) -> None:
+        """Ask workers to finish in-flight requests, then kill stragglers."""
+        for pid in pids:
+            self._kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + settings.WORKER_GRACEFUL_TIMEOUT_SECONDS
+        while any(pid in self.children for pid in pids) and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in pids:
+            if pid in self.children:
+                logger.warning("killing worker %s after graceful timeout", pid)
+                self._kill(pid, signal.SIGKILL)
+        while any(pid in self.children for pid in pids):
+            self.reap()
+            time.sleep(0.05)
+
+    def _kill(self, pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def reap(self) -> None:
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            child = self.children.pop(pid, None)
+            if child is None or not status:
+                continue
+            generation, started = child
+            logger.warning("worker %s exited with status %s", pid, status)
+            if generation != self.generation:
+                continue
+            if time.monotonic() - started >= HEALTHY_UPTIME_SECONDS:
+                self.crashes = 0
+            self.crashes += 1
+            delay = min(RESPAWN_DELAY_SECONDS * 2 ** (self.crashes - 1),
+                        settings.WORKER_RESPAWN_MAX_DELAY_SECONDS)
+            self.respawn_at = time.monotonic() + delay
+            if self.crashes > 1:
+                logger.warning("worker keeps crashing; respawning in %.1fs", delay)
+
+    def restart(self) -> None:
+        old = list(self.children)
+        self.generation += 1
+        for _ in range(self.workers):
+            self.spawn()
+        self.stop(old)
+
+    def run(self) -> None:
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: self._signals.append(signum))
+        for _ in range(self.workers):
+            self.spawn()
+
+        while True:
+            while self._signals:
+                signum = self._signals.pop(0)
+                if signum == signal.SIGHUP:
+                    logger.info("graceful restart")
+                    self.restart()
+                else:
+                    logger.info("shutting down")
+                    self.stop(list(self.children))
+                    return
+            self.reap()
+            # Replace workers that died, but not ones being retired by a restart
+            alive = sum(1 for gen, _ in self.children.values() if gen == self.generation)
+            if alive < self.workers and time.monotonic() >= self.respawn_at:
+                for _ in range(self.workers - alive):
+                    self.spawn()
+            time.sleep(0.5)
+
+
+def _multi_worker_blockers() -> List[str]:
+    """Process-local state that more than one worker would split."""
+    blockers = []
+    for name in ("HOLDS_BACKEND", "IDEMPOTENCY_BACKEND", "EVENTS_BACKEND"):
+        if getattr(settings, name) == "memory":
+            blockers.append(f"{name}=memory is kept per worker")
+    return blockers
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes")
+    parser.add_argument("--workers", type=int, default=settings.worker_count)
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    if args.workers > 1:
+        blockers = _multi_worker_blockers()
+        if blockers:
+            logger.error("refusing to start %s workers: %s", args.workers, "; ".join(blockers))
+            return 2
+
+    # Schema work happens once here; workers inherit the flag and skip it
+    if settings.auto_migrate:
+        migrate(engine)
+    else:
+        check_schema_version(engine)
+    engine.dispose()
+    app.state.schema_checked = True
+
+    config = uvicorn.Config(app, host=args.host, port=args.port, proxy_headers=True)
+    sock = config.bind_socket()
+    Master(config, sock, args.workers).run()
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
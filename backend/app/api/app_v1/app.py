@@ -5,10 +5,20 @@ Main API v1 router that includes all endpoints.
 
 from fastapi import APIRouter
 
-from .endpoints import auth, items, rentals
+from ...core.config import settings
+from .endpoints import auth, events, items, owners, quotes, rentals
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router)
 api_router.include_router(items.router)
 api_router.include_router(rentals.router)
+api_router.include_router(owners.router)
+api_router.include_router(quotes.router)
+api_router.include_router(events.router)
+
+# The profiler (and its SQL hooks) is only imported where it is enabled
+if settings.PROFILER_ENABLED:
+    from .endpoints import profiles
+
+    api_router.include_router(profiles.router)
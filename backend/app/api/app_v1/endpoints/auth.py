@@ -5,13 +5,12 @@ Authentication routes: signup, login, JWT token issuance.
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from datetime import timedelta
 
+from ....schemas.token import RefreshRequest, TokenResponse
 from ....schemas.user import UserCreate, UserResponse
-from ....core.security import create_access_token
+from ....core.security import create_token_pair, decode_payload, oauth2_scheme
 from ....api.deps import get_db
 from backend.app import crud
-from ....core.config import settings
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -28,7 +27,7 @@ def signup(user_in: UserCreate, db: Session = Depends(get_db)):
     return user
 
 
-@router.post("/login")
+@router.post("/login", response_model=TokenResponse)
 def login(user_in: UserCreate, db: Session = Depends(get_db)):
     user = crud.user.authenticate(db, email=user_in.email, password=user_in.password)
     if not user:
@@ -36,6 +35,34 @@ def login(user_in: UserCreate, db: Session = Depends(get_db)):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(subject=user.id, expires_delta=access_token_expires)
-    return {"access_token": access_token, "token_type": "bearer"}
+    return create_token_pair(subject=user.id)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new token pair of the same session.
+    Each refresh token works once; reusing one revokes the whole session.
+    """
+    # Revocation is checked exactly by `rotate`, which must also see spent
+    # tokens to detect reuse
+    payload = decode_payload(body.refresh_token, check_revoked=False)
+    if not payload or payload.get("type") != "refresh" or not crud.token.rotate(db, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+    return create_token_pair(subject=payload["sub"], family=payload["fam"])
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """Revoke the access and refresh tokens of the current session."""
+    payload = decode_payload(token)
+    if not payload or "fam" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    crud.token.revoke_session(db, payload)
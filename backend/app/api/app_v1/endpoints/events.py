@@ -0,0 +1,48 @@
+# backend/app/api/api_v1/endpoints/events.py
+"""
+Event endpoints: server-sent stream of availability changes.
+"""
+
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from ....core.config import settings
+from ....core.events import broker
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("/availability")
+async def stream_availability(request: Request, item_ids: Optional[str] = None):
+    """
+    Stream `availability` events for the comma-separated `item_ids`
+    (all items when omitted). A `resync` event means events were dropped
+    and the client should refetch.
+    """
+    subscribed = {i.strip() for i in item_ids.split(",") if i.strip()} if item_ids else None
+    subscriber = broker.subscribe(subscribed)
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
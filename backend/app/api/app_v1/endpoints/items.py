@@ -11,6 +11,7 @@ from ....schemas.item import ItemCreate, ItemUpdate, ItemResponse
 from ....api.deps import get_db, get_current_user
 from backend.app import crud
 from ....models.user import User
+from ....core.events import ITEM_DELETED, ITEM_UPDATED, publish_availability
 from datetime import datetime
 
 router = APIRouter(prefix="/items", tags=["items"])
@@ -64,7 +65,7 @@ def get_item(item_id: str, db: Session = Depends(get_db)):
     item = crud.item.get(db, id=item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    return item
+    return crud.stock.attach_available(db, [item])[0]
 
 
 @router.put("/{item_id}", response_model=ItemResponse)
@@ -80,6 +81,7 @@ def update_item(
     if item.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this item")
     updated_item = crud.item.update(db, db_obj=item, obj_in=item_in)
+    publish_availability([updated_item.id], ITEM_UPDATED)
     return updated_item
 
 
@@ -95,4 +97,5 @@ def delete_item(
     if item.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this item")
     deleted_item = crud.item.remove(db, id=item_id)
+    publish_availability([item_id], ITEM_DELETED)
     return deleted_item
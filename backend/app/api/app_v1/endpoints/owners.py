@@ -0,0 +1,98 @@
+# backend/app/api/api_v1/endpoints/owners.py
+"""
+Owner endpoints: owned items, rentals of them, and revenue/utilization dashboards.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta
+
+from ....schemas.item import ItemResponse
+from ....schemas.rental import HistoryStatus, RentalHistoryPage
+from ....schemas.rollup import ItemRollupResponse
+from ....api.deps import get_db, get_current_user
+from backend.app import crud
+from ....models.user import User
+from ....core.config import settings
+
+router = APIRouter(prefix="/owner", tags=["owner"])
+
+DEFAULT_DASHBOARD_SPAN = {"day": timedelta(days=30), "week": timedelta(weeks=12)}
+
+
+def _require_owner(current_user: User) -> None:
+    if not current_user.is_owner:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only owners can access owner dashboards",
+        )
+
+
+@router.get("/items", response_model=List[ItemResponse])
+def list_owned_items(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _require_owner(current_user)
+    items = crud.item.get_by_owner(db, owner_id=current_user.id)
+    return crud.stock.attach_available(db, items)
+
+
+@router.get("/dashboard", response_model=List[ItemRollupResponse])
+def get_dashboard(
+    granularity: Literal["day", "week"] = "day",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Per-item rollups for the period (the last 30 days or 12 weeks by default).
+    Revenue is counted on the rental's start date, so booked rentals that
+    start after `end_date` are not included.
+    """
+    _require_owner(current_user)
+    end_date = end_date or datetime.utcnow().date()
+    start_date = start_date or end_date - DEFAULT_DASHBOARD_SPAN[granularity]
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    return crud.rollup.get_owner_dashboard(
+        db,
+        owner_id=current_user.id,
+        granularity=granularity,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+@router.get("/rentals", response_model=RentalHistoryPage)
+def list_owner_rentals(
+    status_filter: Optional[HistoryStatus] = Query(None, alias="status"),
+    item_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Rentals of the caller's items, newest first, with the same filters and
+    cursor pagination as /rentals/history.
+    """
+    _require_owner(current_user)
+    try:
+        rows, next_cursor = crud.rental.get_owner_history(
+            db,
+            owner_id=current_user.id,
+            status=status_filter,
+            item_id=item_id,
+            start_date=start_date,
+            end_date=end_date,
+            cursor=cursor,
+            limit=max(1, min(limit, settings.MAX_PAGE_SIZE)),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return {"items": rows, "next_cursor": next_cursor}
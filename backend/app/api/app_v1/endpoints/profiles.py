@@ -0,0 +1,45 @@
+# backend/app/api/api_v1/endpoints/profiles.py
+"""
+Profile endpoints: list and download per-request profiles.
+Guarded by an operator profiling token (see `python -m backend.app.jobs.profiler`)
+and only mounted when PROFILER_ENABLED is set.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+from ....core.profiling import profile_store
+from ....core.security import verify_profiling_token
+
+router = APIRouter(prefix="/profiles", tags=["profiles"])
+
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    if not verify_profiling_token(x_profile_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profiling token")
+
+
+@router.get("/", dependencies=[Depends(require_profiling_token)])
+def list_profiles():
+    """Stored profiles, newest first, without their SQL statements."""
+    return profile_store.list()
+
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profiling_token)])
+def get_profile(profile_id: str):
+    """Report of one profile, including every SQL statement and its timing."""
+    report = profile_store.get_report(profile_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return report
+
+
+@router.get("/{profile_id}/flamegraph", dependencies=[Depends(require_profiling_token)])
+def download_flamegraph(profile_id: str):
+    """Folded stacks, one `frame;frame;... count` line per distinct stack."""
+    path = profile_store.get_folded_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
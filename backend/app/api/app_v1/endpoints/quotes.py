@@ -0,0 +1,28 @@
+# backend/app/api/api_v1/endpoints/quotes.py
+"""
+Quote endpoints: price many rental lines in one call.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from ....schemas.quote import QuoteRequest, QuoteResponse
+from ....api.deps import get_db
+from backend.app import crud
+from ....core.config import settings
+
+router = APIRouter(prefix="/quotes", tags=["quotes"])
+
+
+@router.post("/", response_model=QuoteResponse)
+def create_quote(quote_in: QuoteRequest, db: Session = Depends(get_db)):
+    if len(quote_in.lines) > settings.QUOTE_MAX_LINES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.QUOTE_MAX_LINES} lines per quote",
+        )
+    lines = crud.pricing.quote(
+        db, lines=quote_in.lines, include_availability=quote_in.include_availability
+    )
+    total_price = sum(line.get("total_price") or 0 for line in lines)
+    return {"lines": lines, "total_price": total_price}
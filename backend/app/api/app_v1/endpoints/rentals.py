@@ -1,16 +1,35 @@
 # backend/app/api/api_v1/endpoints/rentals.py
 """
-Rental endpoints: create rental, list active rentals, end rental.
+Rental endpoints: create rental, list active rentals and history,
+end rental (singly or in batches), checkout holds.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
-from ....schemas.rental import RentalCreate, RentalResponse
+from ....schemas.rental import (
+    HistoryStatus,
+    RentalBatchRequest,
+    RentalBatchResult,
+    RentalCreate,
+    RentalHistoryPage,
+    RentalResponse,
+)
+from ....schemas.hold import HoldCreate, HoldResponse
 from ....api.deps import get_db, get_current_user
 from backend.app import crud
 from ....models.user import User
+from ....core.config import settings
+from ....core.events import (
+    HOLD_PLACED,
+    HOLD_RELEASED,
+    RENTAL_CONFIRMED,
+    RENTAL_CREATED,
+    RENTAL_ENDED,
+    publish_availability,
+)
 
 router = APIRouter(prefix="/rentals", tags=["rentals"])
 
@@ -21,14 +40,66 @@ def create_rental(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    rental_obj = crud.rental.create_with_availability_check(
-        db, obj_in=rental_in, renter_id=current_user.id
-    )
-    if not rental_obj:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Item not available for requested quantity/dates",
+    try:
+        rental_obj = crud.rental.create_with_availability_check(
+            db, obj_in=rental_in, renter_id=current_user.id
         )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    publish_availability([rental_obj.item_id], RENTAL_CREATED)
+    return rental_obj
+
+
+@router.post("/holds", response_model=HoldResponse)
+def place_hold(
+    hold_in: HoldCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        hold_obj = crud.rental.place_hold(db, obj_in=hold_in, renter_id=current_user.id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    publish_availability([hold_obj.item_id], HOLD_PLACED)
+    return hold_obj
+
+
+@router.get("/holds/{hold_id}", response_model=HoldResponse)
+def get_hold(
+    hold_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    hold_obj = crud.hold.get(db, hold_id, renter_id=current_user.id)
+    if not hold_obj:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return hold_obj
+
+
+@router.post("/holds/{hold_id}/release", response_model=HoldResponse)
+def release_hold(
+    hold_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    hold_obj = crud.hold.release(db, hold_id, renter_id=current_user.id)
+    if not hold_obj:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    publish_availability([hold_obj.item_id], HOLD_RELEASED)
+    return hold_obj
+
+
+@router.post("/holds/{hold_id}/checkout", response_model=RentalResponse)
+def checkout_hold(
+    hold_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        rental_obj = crud.rental.create_from_hold(db, hold_id=hold_id, renter_id=current_user.id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    publish_availability([rental_obj.item_id], RENTAL_CREATED)
     return rental_obj
 
 
@@ -41,6 +112,73 @@ def list_active_rentals(
     return rentals
 
 
+@router.get("/history", response_model=RentalHistoryPage)
+def list_rental_history(
+    status_filter: Optional[HistoryStatus] = Query(None, alias="status"),
+    item_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    The caller's rentals, newest first. `start_date`/`end_date` keep rentals
+    overlapping that period; pass `next_cursor` back as `cursor` for the next page.
+    """
+    try:
+        rows, next_cursor = crud.rental.get_history(
+            db,
+            renter_id=current_user.id,
+            status=status_filter,
+            item_id=item_id,
+            start_date=start_date,
+            end_date=end_date,
+            cursor=cursor,
+            limit=max(1, min(limit, settings.MAX_PAGE_SIZE)),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+BATCH_REASONS = {"end": RENTAL_ENDED, "confirm": RENTAL_CONFIRMED}
+
+
+def _process_batch(db: Session, batch_in: RentalBatchRequest, user_id: str, action: str):
+    if len(batch_in.rental_ids) > settings.RENTAL_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.RENTAL_BATCH_MAX_SIZE} rentals per batch",
+        )
+    results = crud.rental.process_batch(
+        db, rental_ids=batch_in.rental_ids, user_id=user_id, action=action
+    )
+    publish_availability(
+        [result["item_id"] for result in results if result["item_id"]], BATCH_REASONS[action]
+    )
+    return results
+
+
+@router.post("/batch/end", response_model=List[RentalBatchResult])
+def end_rentals_batch(
+    batch_in: RentalBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _process_batch(db, batch_in, current_user.id, action="end")
+
+
+@router.post("/batch/confirm", response_model=List[RentalBatchResult])
+def confirm_received_batch(
+    batch_in: RentalBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return _process_batch(db, batch_in, current_user.id, action="confirm")
+
+
 @router.post("/{rental_id}/end", response_model=RentalResponse)
 def end_rental(
     rental_id: str,
@@ -51,6 +189,9 @@ def end_rental(
     if not rental_obj or rental_obj.renter_id != current_user.id:
         raise HTTPException(status_code=404, detail="Rental not found")
     ended_rental = crud.rental.end_rental(db, rental_id=rental_id)
+    if not ended_rental:
+        raise HTTPException(status_code=400, detail="Rental is not active")
+    publish_availability([ended_rental.item_id], RENTAL_ENDED)
     return ended_rental
 
 @router.post("/{rental_id}/confirm", response_model=RentalResponse)
@@ -66,4 +207,7 @@ def confirm_received(
         raise HTTPException(status_code=403, detail="Only owner can confirm receipt")
     
     confirmed_rental = crud.rental.confirm_owner_received(db, rental_id=rental_id)
+    if not confirmed_rental:
+        raise HTTPException(status_code=400, detail="Rental already confirmed")
+    publish_availability([confirmed_rental.item_id], RENTAL_CONFIRMED)
     return confirmed_rental
\ No newline at end of file
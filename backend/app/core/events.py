@@ -0,0 +1,219 @@
+# backend/app/core/events.py
+"""
+Availability-change pub/sub.
+
+- Publishers (request handlers, usually in the threadpool) call `publish_availability`
+- Each subscriber owns a bounded asyncio queue on the event loop
+- A pluggable backend fans events out; "database" and "redis" share them
+  across workers
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from ..crud.availability_event import availability_event as crud_event
+from ..db.session import SessionLocal
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Database polls re-read this far back, so events committed late or stamped
+# by a worker whose clock lags are still delivered
+POLL_OVERLAP = timedelta(seconds=30)
+
+RESYNC_EVENT = "resync"
+
+# Why availability changed, sent as the event's `reason`
+RENTAL_CREATED = "rental_created"
+RENTAL_ENDED = "rental_ended"
+RENTAL_CONFIRMED = "rental_confirmed"
+HOLD_PLACED = "hold_placed"
+HOLD_RELEASED = "hold_released"
+ITEM_UPDATED = "item_updated"
+ITEM_DELETED = "item_deleted"
+
+
+class Subscriber:
+    """
+    One stream consumer. A subscriber whose queue overflows has its backlog
+    replaced by a single resync event, telling the client to refetch.
+    """
+
+    def __init__(self, item_ids: Optional[Set[str]], maxsize: int):
+        self.item_ids = item_ids
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def wants(self, item_id: str) -> bool:
+        return self.item_ids is None or item_id in self.item_ids
+
+    def offer(self, event: dict) -> None:
+        # Runs on the subscriber's event loop
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"event": RESYNC_EVENT, "ts": time.time()})
+            return
+        self.queue.put_nowait(event)
+
+
+class InMemoryBackend:
+    """Delivers events within the current process only."""
+
+    def start(self, dispatch: Callable[[dict], None]) -> None:
+        self._dispatch = dispatch
+
+    def publish_many(self, events: List[dict]) -> None:
+        for event in events:
+            self._dispatch(event)
+
+
+class DatabaseBackend:
+    """
+    Fans events out to every worker through the `availability_events` table.
+
+    Each worker polls for events created since its last poll, less
+    POLL_OVERLAP, and skips ids it already delivered.
+    """
+
+    def __init__(self, poll_seconds: float, session_factory: Callable = SessionLocal):
+        self.poll_seconds = poll_seconds
+        self._session_factory = session_factory
+
+    def start(self, dispatch: Callable[[dict], None]) -> None:
+        since = datetime.utcnow()
+
+        def poll() -> None:
+            nonlocal since
+            delivered: Dict[int, datetime] = {}  # id -> created_at, within the overlap
+            while True:
+                time.sleep(self.poll_seconds)
+                db = self._session_factory()
+                try:
+                    rows = crud_event.get_since(db, since - POLL_OVERLAP)
+                except Exception:
+                    logger.exception("polling availability events failed")
+                    continue
+                finally:
+                    db.close()
+                for event_id, item_id, reason, created_at in rows:
+                    if event_id in delivered:
+                        continue
+                    delivered[event_id] = created_at
+                    since = max(since, created_at)
+                    dispatch({
+                        "event": "availability",
+                        "item_id": item_id,
+                        "reason": reason,
+                        "ts": created_at.replace(tzinfo=timezone.utc).timestamp(),
+                    })
+                cutoff = since - POLL_OVERLAP
+                delivered = {i: at for i, at in delivered.items() if at >= cutoff}
+
+        threading.Thread(target=poll, name="events-database", daemon=True).start()
+
+    def publish_many(self, events: List[dict]) -> None:
+        db = self._session_factory()
+        try:
+            crud_event.add_many(db, [
+                (event["item_id"], event["reason"], datetime.utcfromtimestamp(event["ts"]))
+                for event in events
+            ])
+        finally:
+            db.close()
+
+
+class RedisBackend:
+    """
+    Fans events out to every worker through a Redis channel. Requires the
+    optional `redis` package.
+    """
+
+    def __init__(self, url: str, channel: str):
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("EVENTS_BACKEND=redis requires the 'redis' package") from exc
+        self._client = redis.Redis.from_url(url)
+        self.channel = channel
+
+    def start(self, dispatch: Callable[[dict], None]) -> None:
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+
+        def listen() -> None:
+            for message in pubsub.listen():
+                dispatch(json.loads(message["data"]))
+
+        threading.Thread(target=listen, name="events-redis", daemon=True).start()
+
+    def publish_many(self, events: List[dict]) -> None:
+        pipeline = self._client.pipeline(transaction=False)
+        for event in events:
+            pipeline.publish(self.channel, json.dumps(event))
+        pipeline.execute()
+
+
+class EventBroker:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscriber] = set()
+        self._backend = None
+
+    def _get_backend(self):
+        # Started lazily so forked workers each open their own connection
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    if settings.EVENTS_BACKEND == "redis":
+                        backend = RedisBackend(settings.EVENTS_REDIS_URL, settings.EVENTS_CHANNEL)
+                    elif settings.EVENTS_BACKEND == "database":
+                        backend = DatabaseBackend(settings.EVENTS_POLL_SECONDS)
+                    else:
+                        backend = InMemoryBackend()
+                    backend.start(self._dispatch)
+                    self._backend = backend
+        return self._backend
+
+    def subscribe(self, item_ids: Optional[Iterable[str]] = None) -> Subscriber:
+        self._get_backend()
+        subscriber = Subscriber(set(item_ids) if item_ids else None, self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish_many(self, events: List[dict]) -> None:
+        if events:
+            self._get_backend().publish_many(events)
+
+    def _dispatch(self, event: dict) -> None:
+        with self._lock:
+            targets = [s for s in self._subscribers if s.wants(event["item_id"])]
+        for subscriber in targets:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+            except RuntimeError:
+                # Loop already closed; the stream's cleanup will unsubscribe it
+                pass
+
+
+broker = EventBroker(queue_size=settings.EVENTS_QUEUE_SIZE)
+
+
+def publish_availability(item_ids: Iterable[str], reason: str) -> None:
+    """Announce that availability of the given items may have changed."""
+    now = time.time()
+    broker.publish_many([
+        {"event": "availability", "item_id": item_id, "reason": reason, "ts": now}
+        for item_id in dict.fromkeys(item_ids)
+    ])
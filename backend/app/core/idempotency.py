@@ -0,0 +1,329 @@
+# backend/app/core/idempotency.py
+"""
+Idempotency-Key support for mutating endpoints.
+
+- Pluggable response store with a TTL: in memory per process, or the
+  `idempotency_keys` table shared by every worker (IDEMPOTENCY_BACKEND)
+- Concurrent duplicates wait for the in-flight request to finish
+- Stored responses are replayed without running the endpoint again
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..crud.idempotency import idempotency as crud_idempotency
+from ..db.session import SessionLocal
+from .config import settings
+from .security import decode_token
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+
+@dataclass
+class CachedResponse:
+    fingerprint: str
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    expires_at: float
+
+
+class IdempotencyStore:
+    """
+    LRU store of finished responses plus a registry of in-flight keys.
+
+    All methods run on the event loop, so no locking is needed. Each worker
+    process keeps its own store.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._responses: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], asyncio.Event] = {}
+
+    async def get(self, key: Tuple[str, str]) -> Optional[CachedResponse]:
+        cached = self._responses.get(key)
+        if cached is None:
+            return None
+        if cached.expires_at <= time.monotonic():
+            del self._responses[key]
+            return None
+        self._responses.move_to_end(key)
+        return cached
+
+    async def begin(self, key: Tuple[str, str], fingerprint: str) -> bool:
+        """Claim a key; False if a request holding it is still in flight."""
+        if key in self._in_flight:
+            return False
+        self._in_flight[key] = asyncio.Event()
+        return True
+
+    async def wait(self, key: Tuple[str, str], timeout: float) -> bool:
+        """Wait for the in-flight request to finish; False on timeout."""
+        event = self._in_flight.get(key)
+        if event is None:
+            return True
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def put(self, key: Tuple[str, str], fingerprint: str, status: int,
+                  headers: List[Tuple[bytes, bytes]], body: bytes) -> None:
+        self._responses[key] = CachedResponse(
+            fingerprint=fingerprint,
+            status=status,
+            headers=headers,
+            body=body,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.max_entries:
+            self._responses.popitem(last=False)
+
+    async def finish(self, key: Tuple[str, str]) -> None:
+        event = self._in_flight.pop(key, None)
+        if event is not None:
+            event.set()
+
+
+class DatabaseIdempotencyStore:
+    """
+    Store shared by every worker through the `idempotency_keys` table.
+
+    A claim is an insert on the key's primary key, so exactly one request
+    wins; duplicates poll until its response is stored. A claim left by a
+    crashed worker can be taken over once its lease expires.
+    """
+
+    def __init__(self, ttl_seconds: int, lease_seconds: float, poll_seconds: float,
+                 session_factory: Callable = SessionLocal):
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self._session_factory = session_factory
+
+    def _call(self, method: str, *args):
+        # Runs in the threadpool, one short session per call
+        db = self._session_factory()
+        try:
+            return getattr(crud_idempotency, method)(db, *args)
+        finally:
+            db.close()
+
+    def _load(self, key: Tuple[str, str]) -> Tuple[bool, Optional[CachedResponse]]:
+        """(in flight, stored response) for a key."""
+        db = self._session_factory()
+        try:
+            row = crud_idempotency.get(db, *key)
+            if row is None:
+                return False, None
+            if row.status is None:
+                return True, None
+            return False, CachedResponse(
+                fingerprint=row.fingerprint,
+                status=row.status,
+                headers=[(name.encode("latin-1"), value.encode("latin-1"))
+                         for name, value in json.loads(row.headers)],
+                body=row.body,
+                expires_at=row.expires_at.timestamp(),
+            )
+        finally:
+            db.close()
+
+    async def get(self, key: Tuple[str, str]) -> Optional[CachedResponse]:
+        _, cached = await run_in_threadpool(self._load, key)
+        return cached
+
+    async def begin(self, key: Tuple[str, str], fingerprint: str) -> bool:
+        return await run_in_threadpool(
+            self._call, "claim", *key, fingerprint, self.lease_seconds
+        )
+
+    async def wait(self, key: Tuple[str, str], timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            in_flight, _ = await run_in_threadpool(self._load, key)
+            if not in_flight:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(self.poll_seconds)
+
+    async def put(self, key: Tuple[str, str], fingerprint: str, status: int,
+                  headers: List[Tuple[bytes, bytes]], body: bytes) -> None:
+        encoded = json.dumps(
+            [[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers]
+        )
+        await run_in_threadpool(
+            self._call, "store", *key, status, encoded, body, self.ttl_seconds
+        )
+
+    async def finish(self, key: Tuple[str, str]) -> None:
+        await run_in_threadpool(self._call, "release", *key)
+
+
+def create_store():
+    if settings.IDEMPOTENCY_BACKEND == "database":
+        return DatabaseIdempotencyStore(
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS,
+            poll_seconds=settings.IDEMPOTENCY_POLL_SECONDS,
+        )
+    return IdempotencyStore(
+        max_entries=settings.IDEMPOTENCY_MAX_KEYS,
+        ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    )
+
+
+idempotency_store = create_store()
+
+
+def _principal(headers: Headers) -> Optional[str]:
+    """Resolve the caller from the bearer token without a database lookup."""
+    authorization = headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return decode_token(token)
+
+
+async def _send_json(send: Send, status: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """
+    Pure ASGI middleware honouring the Idempotency-Key header.
+
+    Only authenticated requests whose method and path match are handled;
+    everything else passes straight through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path_prefixes: Sequence[str] = ("/",),
+        methods: Sequence[str] = ("POST",),
+        store=None,
+    ):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.methods = {m.upper() for m in methods}
+        self.store = store or idempotency_store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.methods
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        principal = _principal(headers) if idempotency_key else None
+        if not idempotency_key or not principal:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, "Idempotency-Key is too long")
+            return
+
+        # Buffer the request body so it can be fingerprinted and re-fed to the app
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        fingerprint = hashlib.sha256(
+            scope["method"].encode() + b" " + scope["path"].encode() + b"\n" + body
+        ).hexdigest()
+        key = (principal, idempotency_key)
+
+        # Replay a stored response, or wait for a concurrent duplicate to finish
+        while True:
+            cached = await self.store.get(key)
+            if cached is not None:
+                if cached.fingerprint != fingerprint:
+                    await _send_json(
+                        send, 422, "Idempotency-Key was already used with a different request"
+                    )
+                    return
+                await send({
+                    "type": "http.response.start",
+                    "status": cached.status,
+                    "headers": cached.headers + [(REPLAYED_HEADER, b"true")],
+                })
+                await send({"type": "http.response.body", "body": cached.body})
+                return
+
+            if await self.store.begin(key, fingerprint):
+                break
+            if not await self.store.wait(key, settings.IDEMPOTENCY_WAIT_SECONDS):
+                await _send_json(send, 409, "A request with this Idempotency-Key is in progress")
+                return
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status_code = 500
+        response_headers: List[Tuple[bytes, bytes]] = []
+        response_body: List[bytes] = []
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status_code, response_headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response_body.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+            # Server errors are not stored so that a retry gets another chance
+            if status_code < 500:
+                await self.store.put(
+                    key,
+                    fingerprint=fingerprint,
+                    status=status_code,
+                    headers=response_headers,
+                    body=b"".join(response_body),
+                )
+        finally:
+            await self.store.finish(key)
@@ -0,0 +1,156 @@
+# backend/app/core/load_shedding.py
+"""
+Adaptive load shedding and per-request deadlines.
+
+- A concurrency limiter admits a bounded number of requests at a time
+- Excess requests wait in a bounded priority queue with a per-priority budget
+- Requests that cannot be admitted in time get a fast 503
+- Admitted requests carry a deadline that the database layer turns into
+  statement timeouts
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+
+# Monotonic deadline of the request being served, if any
+request_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline has passed before a database statement."""
+
+
+def deadline_expired() -> bool:
+    deadline = request_deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+class ConcurrencyLimiter:
+    """
+    Admission control on the event loop. Waiters are served lowest priority
+    value first; when the queue is full a newcomer may displace the least
+    important waiter, otherwise it is rejected.
+    """
+
+    def __init__(self, max_concurrency: int, queue_size: int):
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def _prune(self) -> None:
+        self._waiters = [w for w in self._waiters if not w[2].done()]
+        heapq.heapify(self._waiters)
+
+    async def acquire(self, priority: int, timeout: float) -> bool:
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return True
+
+        if len(self._waiters) >= self.queue_size:
+            self._prune()
+        if len(self._waiters) >= self.queue_size:
+            worst = max(self._waiters)
+            if worst[0] <= priority:
+                return False
+            # Shed the least important waiter to make room
+            worst[2].set_result(False)
+            self._prune()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # A slot was handed over just as the budget ran out
+                return future.result()
+            future.cancel()
+            return False
+        except asyncio.CancelledError:
+            # Client went away while queued; pass on a slot it was already given
+            if future.done() and not future.cancelled() and future.result():
+                self.release()
+            future.cancel()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter
+                future.set_result(True)
+                return
+        self.active -= 1
+
+
+class LoadSheddingMiddleware:
+    """
+    Pure ASGI middleware. `priorities` maps (method, path prefix) to a
+    priority, 0 being the most important; unmatched requests get
+    `default_priority`. Long-lived streams should be listed in `exempt_prefixes`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        priorities: Sequence[Tuple[str, str, int]] = (),
+        default_priority: int = 1,
+        exempt_prefixes: Sequence[str] = (),
+        limiter: Optional[ConcurrencyLimiter] = None,
+    ):
+        self.app = app
+        self.priorities = list(priorities)
+        self.default_priority = default_priority
+        self.exempt_prefixes = tuple(exempt_prefixes)
+        self.limiter = limiter or ConcurrencyLimiter(
+            max_concurrency=settings.LOAD_SHED_MAX_CONCURRENCY,
+            queue_size=settings.LOAD_SHED_QUEUE_SIZE,
+        )
+
+    def _priority(self, scope: Scope) -> int:
+        for method, prefix, priority in self.priorities:
+            if scope["method"] == method and scope["path"].startswith(prefix):
+                return priority
+        return self.default_priority
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.LOAD_SHED_ENABLED
+            or scope["path"].startswith(self.exempt_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        arrival = time.monotonic()
+        priority = self._priority(scope)
+        budgets = settings.LOAD_SHED_QUEUE_BUDGETS
+        budget = budgets[min(priority, len(budgets) - 1)]
+        if not await self.limiter.acquire(priority, budget):
+            response = JSONResponse(
+                {"detail": "Server is overloaded, please retry"},
+                status_code=503,
+                headers={"Retry-After": str(settings.LOAD_SHED_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        token = request_deadline.set(arrival + settings.REQUEST_DEADLINE_SECONDS)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
+            self.limiter.release()
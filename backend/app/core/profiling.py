@@ -0,0 +1,307 @@
+# backend/app/core/profiling.py
+"""
+Opt-in profiling of single requests.
+
+- A sampler thread records the stacks that work on the profiled request:
+  the event loop while the request's task runs, and threadpool calls that
+  issued SQL for it
+- SQL statements and their timings are captured alongside
+- Results are written as a JSON report plus a folded-stack file that
+  flamegraph.pl, speedscope and similar tools read directly
+
+Requests that are not profiled never reach any of this beyond a header
+check; the SQL listeners are only attached while a profile is running.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..db.session import engine
+from .config import settings
+from .security import verify_profiling_token
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+WAITING_FRAME = "[waiting]"
+
+# Session of the request being profiled, if any
+current_profile: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}".replace(";", ":")
+
+
+def _stack(frame) -> List:
+    """Frames of a thread, outermost first."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _call_root(frames: List):
+    # Threadpool threads run `_bootstrap` -> `_bootstrap_inner` -> `run`; the
+    # next frame is the call handed to the thread and is new for every call
+    return frames[3] if len(frames) > 3 else None
+
+
+class ProfileSession:
+    def __init__(self, scope: Scope, trigger: str):
+        self.id = uuid.uuid4().hex
+        self.trigger = trigger
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query = scope.get("query_string", b"").decode("latin-1")
+        self.status: Optional[int] = None
+        self.started_at = datetime.utcnow()
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        self.loop_thread = threading.get_ident()
+        self.samples: Counter = Counter()
+        self.statements: List[dict] = []
+        # thread id -> root frame of the threadpool call working for this request
+        self._threads: Dict[int, object] = {}
+        self._stop = threading.Event()
+        self._started = time.perf_counter()
+        self._duration = 0.0
+
+    # --- Called from threads working on the request ---
+    def attach_current_thread(self) -> None:
+        if threading.get_ident() == self.loop_thread:
+            return
+        root = _call_root(_stack(sys._getframe()))
+        if root is not None:
+            self._threads[threading.get_ident()] = root
+
+    def record_statement(self, statement: str, seconds: float, rows: int, many: bool) -> None:
+        self.statements.append({
+            "statement": statement,
+            "duration_ms": round(seconds * 1000, 3),
+            "rows": rows,
+            "executemany": many,
+        })
+
+    # --- Sampler ---
+    def _sample(self) -> None:
+        sampled = False
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self.loop_thread:
+                if asyncio.current_task(self.loop) is not self.task:
+                    continue
+                frames = _stack(frame)
+            else:
+                root = self._threads.get(thread_id)
+                if root is None:
+                    continue
+                frames = _stack(frame)
+                if _call_root(frames) is not root:
+                    continue
+            self.samples[";".join(_frame_label(f) for f in frames)] += 1
+            sampled = True
+        if not sampled:
+            # Wall time the request spent waiting (I/O, queueing for a thread)
+            self.samples[WAITING_FRAME] += 1
+
+    def _run(self) -> None:
+        interval = settings.PROFILER_INTERVAL_MS / 1000
+        while not self._stop.wait(interval):
+            self._sample()
+        profile_store.save(self)
+
+    def start(self) -> None:
+        _sql_capture.acquire()
+        threading.Thread(target=self._run, name=f"profiler-{self.id}", daemon=True).start()
+
+    def stop(self) -> None:
+        self._duration = time.perf_counter() - self._started
+        _sql_capture.release()
+        self._stop.set()
+
+    def report(self) -> dict:
+        return {
+            "id": self.id,
+            "trigger": self.trigger,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self._duration * 1000, 3),
+            "interval_ms": settings.PROFILER_INTERVAL_MS,
+            "samples": sum(self.samples.values()),
+            "sql_count": len(self.statements),
+            "sql_total_ms": round(sum(s["duration_ms"] for s in self.statements), 3),
+            "sql": self.statements,
+        }
+
+
+class _SqlCapture:
+    """Engine listeners attached only while at least one profile runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = 0
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._active += 1
+            if self._active == 1:
+                event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    def release(self) -> None:
+        with self._lock:
+            self._active -= 1
+            if self._active == 0:
+                event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+                event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    session = current_profile.get()
+    if session is not None:
+        session.attach_current_thread()
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    session = current_profile.get()
+    started = conn.info.get("profile_started")
+    if session is not None and started:
+        session.record_statement(
+            statement, time.perf_counter() - started.pop(), cursor.rowcount, executemany
+        )
+
+
+class ProfileStore:
+    """Profiles on disk: `<id>.json` reports and `<id>.folded` stacks."""
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{suffix}")
+
+    def save(self, session: ProfileSession) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(session.id, "folded"), "w", encoding="utf-8") as fh:
+            for stack, count in session.samples.most_common():
+                fh.write(f"{stack} {count}\n")
+        with open(self._path(session.id, "json"), "w", encoding="utf-8") as fh:
+            json.dump(session.report(), fh, indent=2)
+        self._trim()
+
+    def _trim(self) -> None:
+        reports = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in reports[:max(0, len(reports) - self.max_profiles)]:
+            profile_id = entry.name[:-len(".json")]
+            for suffix in ("json", "folded"):
+                try:
+                    os.remove(self._path(profile_id, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[dict]:
+        if not os.path.isdir(self.directory):
+            return []
+        summaries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                with open(entry.path, encoding="utf-8") as fh:
+                    report = json.load(fh)
+                report.pop("sql", None)
+                summaries.append(report)
+        return sorted(summaries, key=lambda report: report["started_at"], reverse=True)
+
+    def _valid_id(self, profile_id: str) -> bool:
+        return len(profile_id) == 32 and all(c in "0123456789abcdef" for c in profile_id)
+
+    def get_report(self, profile_id: str) -> Optional[dict]:
+        if not self._valid_id(profile_id) or not os.path.exists(self._path(profile_id, "json")):
+            return None
+        with open(self._path(profile_id, "json"), encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def get_folded_path(self, profile_id: str) -> Optional[str]:
+        path = self._path(profile_id, "folded")
+        return path if self._valid_id(profile_id) and os.path.exists(path) else None
+
+
+_sql_capture = _SqlCapture()
+profile_store = ProfileStore(settings.PROFILER_OUTPUT_DIR, settings.PROFILER_MAX_PROFILES)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware; add it innermost so the profile covers the app
+    rather than load-shedding queue time. The response of a profiled request
+    carries an X-Profile-Id header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._background = 0
+
+    def _select(self, scope: Scope) -> Optional[str]:
+        token = Headers(scope=scope).get(PROFILE_TOKEN_HEADER)
+        if token is not None:
+            return "header" if verify_profiling_token(token) else None
+        if (
+            settings.PROFILER_SAMPLE_RATE
+            and self._background < settings.PROFILER_MAX_CONCURRENT
+            and random.random() < settings.PROFILER_SAMPLE_RATE
+        ):
+            return "sample"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        trigger = self._select(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(scope, trigger)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                session.status = message["status"]
+                headers: List[Tuple[bytes, bytes]] = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, session.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        if trigger == "sample":
+            self._background += 1
+        token = current_profile.set(session)
+        session.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            session.stop()
+            current_profile.reset(token)
+            if trigger == "sample":
+                self._background -= 1
@@ -0,0 +1,121 @@
+# backend/app/core/revocation.py
+"""
+In-memory mirror of the token denylist.
+
+- A Bloom filter answers "definitely not revoked" for almost every token
+- Possible hits fall back to an exact dict of revoked ids
+- A background thread pulls new revocations from the database, so checking
+  a token never queries it
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+
+# Returns (jti, expires_at, revoked_at) rows revoked since about the given time,
+# or all live rows when it is None
+Loader = Callable[[Optional[datetime]], List[Tuple[str, datetime, datetime]]]
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+class RevocationList:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._revoked: Dict[str, datetime] = {}  # jti -> expires_at
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._synced_at: Optional[datetime] = None
+        self._sync_pid: Optional[int] = None
+
+    def is_revoked(self, *token_ids: Optional[str]) -> bool:
+        for token_id in token_ids:
+            if token_id and token_id in self._bloom and token_id in self._revoked:
+                return True
+        return False
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+            if len(self._revoked) > self.capacity:
+                self._rebuild()
+            else:
+                self._bloom.add(jti)
+
+    def _rebuild(self) -> None:
+        # Caller holds the lock. Drops expired ids, growing the filter if needed.
+        now = datetime.utcnow()
+        live = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        if len(live) == len(self._revoked) and len(live) <= self.capacity:
+            return
+        self._revoked = live
+        while len(self._revoked) > self.capacity:
+            self.capacity *= 2
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        for jti in self._revoked:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    # --- Sync from the database ---
+    def sync(self, loader: Loader) -> None:
+        rows = loader(self._synced_at)
+        with self._lock:
+            for jti, expires_at, revoked_at in rows:
+                self._revoked[jti] = expires_at
+                self._bloom.add(jti)
+                if self._synced_at is None or revoked_at > self._synced_at:
+                    self._synced_at = revoked_at
+            self._rebuild()
+
+    def start_sync(self, loader: Loader, interval: int) -> None:
+        """Load the denylist, then keep it current from a daemon thread."""
+        # Threads do not survive fork, so every worker starts its own
+        if self._sync_pid == os.getpid():
+            return
+        self._sync_pid = os.getpid()
+        self.sync(loader)
+
+        def run() -> None:
+            while True:
+                time.sleep(interval)
+                try:
+                    self.sync(loader)
+                except Exception:  # noqa: BLE001 - keep serving with the last known list
+                    pass
+
+        threading.Thread(target=run, name="revocation-sync", daemon=True).start()
+
+
+revocations = RevocationList(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+)
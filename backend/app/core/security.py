@@ -6,6 +6,7 @@ Security utilities:
 - Current user dependency for FastAPI routes
 """
 
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Any
 
@@ -15,6 +16,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 from .config import settings
+from .revocation import revocations
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -32,22 +34,82 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def warm_up_hashing() -> None:
+    """Load the bcrypt backend now rather than on the first login."""
+    pwd_context.handler("bcrypt").get_backend()
+
+
 # --- JWT Handling ---
-def create_access_token(subject: str | Any, expires_delta: Optional[timedelta] = None) -> str:
+# Every token carries its own id (`jti`) and the id of the login session it
+# belongs to (`fam`), so either can be revoked.
+def _encode(subject: str | Any, token_type: str, expires_delta: timedelta,
+            family: Optional[str]) -> str:
     if isinstance(subject, (dict, list)):
         raise ValueError("JWT subject must be a string, not dict/list")
-    expire = datetime.utcnow() + (expires_delta or settings.access_token_expiry)
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    to_encode = {
+        "exp": datetime.utcnow() + expires_delta,
+        "sub": str(subject),
+        "type": token_type,
+        "jti": str(uuid.uuid4()),
+        "fam": family or str(uuid.uuid4()),
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def decode_token(token: str) -> Optional[str]:
+def create_access_token(
+    subject: str | Any, expires_delta: Optional[timedelta] = None, family: Optional[str] = None
+) -> str:
+    return _encode(subject, "access", expires_delta or settings.access_token_expiry, family)
+
+
+def create_refresh_token(subject: str | Any, family: Optional[str] = None) -> str:
+    return _encode(subject, "refresh", settings.refresh_token_expiry, family)
+
+
+def create_token_pair(subject: str | Any, family: Optional[str] = None) -> dict:
+    """Access and refresh tokens of one login session."""
+    family = family or str(uuid.uuid4())
+    return {
+        "access_token": create_access_token(subject, family=family),
+        "refresh_token": create_refresh_token(subject, family=family),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def decode_payload(token: str, check_revoked: bool = True) -> Optional[dict]:
+    """Verified claims of a token that, unless told otherwise, has not been revoked."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload.get("sub")
     except JWTError:
         return None
+    if check_revoked and revocations.is_revoked(payload.get("jti"), payload.get("fam")):
+        return None
+    return payload
+
+
+def decode_token(token: str) -> Optional[str]:
+    """User id of a valid access token; refresh tokens are not accepted."""
+    payload = decode_payload(token)
+    if not payload or payload.get("type", "access") != "access":
+        return None
+    return payload.get("sub")
+
+
+def create_profiling_token(expires_delta: Optional[timedelta] = None) -> str:
+    """Operator token allowing requests to be profiled and profiles downloaded."""
+    expire = datetime.utcnow() + (
+        expires_delta or timedelta(minutes=settings.PROFILER_TOKEN_TTL_MINUTES)
+    )
+    to_encode = {"exp": expire, "sub": "profiler", "type": "profile"}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def verify_profiling_token(token: Optional[str]) -> bool:
+    if not token:
+        return False
+    payload = decode_payload(token)
+    return bool(payload) and payload.get("type") == "profile"
 
 
 # --- Dependencies ---
@@ -6,4 +6,11 @@ Provides unified access to all CRUD objects.
 
 from .user import user
 from .item import item
-from .rental import rental
\ No newline at end of file
+from .rental import rental
+from .hold import hold
+from .stock import stock
+from .rollup import rollup
+from .pricing import pricing
+from .token import token
+from .idempotency import idempotency
+from .availability_event import availability_event
@@ -0,0 +1,53 @@
+# backend/app/crud/availability_event.py
+"""
+CRUD operations for shared availability events.
+Handles publishing, polling for new events, and pruning.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models.availability_event import AvailabilityEvent
+
+
+class CRUDAvailabilityEvent:
+    def add_many(self, db: Session, events: Iterable[Tuple[str, str, datetime]]) -> None:
+        """Insert (item_id, reason, created_at) events in one transaction."""
+        db.add_all([
+            AvailabilityEvent(item_id=item_id, reason=reason, created_at=created_at)
+            for item_id, reason, created_at in events
+        ])
+        db.commit()
+
+    def get_since(self, db: Session, since: datetime) -> List[Tuple[int, str, str, datetime]]:
+        """(id, item_id, reason, created_at) of events created at or after `since`."""
+        rows = (
+            db.query(
+                AvailabilityEvent.id,
+                AvailabilityEvent.item_id,
+                AvailabilityEvent.reason,
+                AvailabilityEvent.created_at,
+            )
+            .filter(AvailabilityEvent.created_at >= since)
+            .order_by(AvailabilityEvent.id)
+            .all()
+        )
+        return [tuple(row) for row in rows]
+
+    def prune(self, db: Session, retention_seconds: int) -> int:
+        """Delete events older than the retention; streams only ever poll recent ones."""
+        deleted = (
+            db.query(AvailabilityEvent)
+            .filter(
+                AvailabilityEvent.created_at
+                < datetime.utcnow() - timedelta(seconds=retention_seconds)
+            )
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+availability_event = CRUDAvailabilityEvent()
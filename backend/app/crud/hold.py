@@ -0,0 +1,369 @@
+# backend/app/crud/hold.py
+"""
+Stores for short-lived reservation holds.
+Holds reserve stock for a renter during checkout without writing rentals.
+
+- `DatabaseHoldStore` keeps them in the `stock_holds` table, shared by every
+  worker; placing and taking a hold join the caller's transaction
+- `HoldStore` keeps them in process memory, for a single worker
+"""
+
+import heapq
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.stock_hold import StockHold
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Rentals are stored as naive UTC datetimes; compare holds the same way
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@dataclass
+class Hold:
+    id: str
+    item_id: str
+    renter_id: str
+    start_date: datetime
+    end_date: datetime
+    quantity: int
+    expires_at: float
+
+    def overlaps(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> bool:
+        if start_date and self.end_date < start_date:
+            return False
+        if end_date and self.start_date > end_date:
+            return False
+        return True
+
+
+def _ttl(ttl_seconds: Optional[int]) -> int:
+    return min(ttl_seconds or settings.HOLD_TTL_SECONDS, settings.HOLD_MAX_TTL_SECONDS)
+
+
+class HoldStore:
+    """
+    Holds indexed by id and by item, with a min-heap of expiry times.
+
+    Expired holds are swept lazily from the top of the heap on every access,
+    and released or converted holds leave stale heap entries that are skipped.
+    Takes the same arguments as `DatabaseHoldStore` but ignores the session.
+    """
+
+    def __init__(self, state_path: Optional[str] = None):
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._holds: Dict[str, Hold] = {}
+        self._by_item: Dict[str, Set[str]] = defaultdict(set)
+        self._expiry_heap: List[Tuple[float, str]] = []
+        if state_path:
+            self._load()
+
+    # --- Internal helpers (caller holds the lock) ---
+    def _add(self, hold: Hold) -> None:
+        self._holds[hold.id] = hold
+        self._by_item[hold.item_id].add(hold.id)
+        heapq.heappush(self._expiry_heap, (hold.expires_at, hold.id))
+
+    def _discard(self, hold_id: str) -> Optional[Hold]:
+        hold = self._holds.pop(hold_id, None)
+        if hold is not None:
+            item_holds = self._by_item[hold.item_id]
+            item_holds.discard(hold_id)
+            if not item_holds:
+                del self._by_item[hold.item_id]
+        return hold
+
+    def _sweep(self) -> bool:
+        now = time.time()
+        swept = False
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, hold_id = heapq.heappop(self._expiry_heap)
+            if self._discard(hold_id) is not None:
+                swept = True
+        return swept
+
+    def _held(self, item_id: str, start_date: Optional[datetime],
+              end_date: Optional[datetime]) -> int:
+        return sum(
+            self._holds[hold_id].quantity
+            for hold_id in self._by_item.get(item_id, ())
+            if self._holds[hold_id].overlaps(start_date, end_date)
+        )
+
+    def _load(self) -> None:
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, encoding="utf-8") as fh:
+            for raw in json.load(fh):
+                raw["start_date"] = datetime.fromisoformat(raw["start_date"])
+                raw["end_date"] = datetime.fromisoformat(raw["end_date"])
+                self._add(Hold(**raw))
+        self._sweep()
+
+    def _persist(self) -> None:
+        if not self.state_path:
+            return
+        payload = [
+            {**asdict(hold),
+             "start_date": hold.start_date.isoformat(),
+             "end_date": hold.end_date.isoformat()}
+            for hold in self._holds.values()
+        ]
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh)
+        os.replace(tmp_path, self.state_path)
+
+    # --- Public API ---
+    def held_quantity(
+        self,
+        db: Session,
+        item_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> int:
+        """Total quantity held on an item for holds overlapping the period."""
+        return self.held_quantities(db, [item_id], start_date, end_date).get(item_id, 0)
+
+    def held_quantities(
+        self,
+        db: Session,
+        item_ids: Iterable[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Dict[str, int]:
+        """`held_quantity` for many items; items with nothing held are omitted."""
+        start_date, end_date = _naive_utc(start_date), _naive_utc(end_date)
+        with self._lock:
+            if self._sweep():
+                self._persist()
+            held = {item_id: self._held(item_id, start_date, end_date) for item_id in item_ids}
+        return {item_id: quantity for item_id, quantity in held.items() if quantity}
+
+    def place(
+        self,
+        db: Session,
+        *,
+        item_id: str,
+        renter_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        quantity: int,
+        available: int,
+        ttl_seconds: Optional[int] = None,
+    ) -> Optional[Hold]:
+        """
+        Place a hold if `available` (stock minus overlapping rentals) still
+        covers it once the other live holds are subtracted. The caller holds
+        the item's row lock, so `available` cannot change underneath it;
+        the store's own lock only guards its dictionaries.
+        """
+        start_date, end_date = _naive_utc(start_date), _naive_utc(end_date)
+        with self._lock:
+            self._sweep()
+            if quantity > available - self._held(item_id, start_date, end_date):
+                return None
+            hold = Hold(
+                id=str(uuid.uuid4()),
+                item_id=item_id,
+                renter_id=renter_id,
+                start_date=start_date,
+                end_date=end_date,
+                quantity=quantity,
+                expires_at=time.time() + _ttl(ttl_seconds),
+            )
+            self._add(hold)
+            self._persist()
+            return hold
+
+    def get(self, db: Session, hold_id: str, renter_id: str) -> Optional[Hold]:
+        with self._lock:
+            if self._sweep():
+                self._persist()
+            hold = self._holds.get(hold_id)
+            if hold is None or hold.renter_id != renter_id:
+                return None
+            return hold
+
+    def take(self, db: Session, hold_id: str, renter_id: str) -> Optional[Hold]:
+        """Remove a renter's hold to convert it; `restore` puts it back."""
+        with self._lock:
+            swept = self._sweep()
+            hold = self._holds.get(hold_id)
+            if hold is None or hold.renter_id != renter_id:
+                if swept:
+                    self._persist()
+                return None
+            self._discard(hold_id)
+            self._persist()
+            return hold
+
+    def release(self, db: Session, hold_id: str, renter_id: str) -> Optional[Hold]:
+        """Remove a renter's hold."""
+        return self.take(db, hold_id, renter_id)
+
+    def restore(self, hold: Hold) -> None:
+        """Put back a hold taken by a checkout that then failed, unless it expired."""
+        with self._lock:
+            if hold.expires_at > time.time() and hold.id not in self._holds:
+                self._add(hold)
+                self._persist()
+
+
+class DatabaseHoldStore:
+    """
+    Holds in the `stock_holds` table, shared by every worker.
+
+    `place` and `take` only add to the caller's transaction, which already
+    holds the item's row lock; a failed checkout's rollback brings the taken
+    hold back, so `restore` has nothing to do. Expired rows are ignored.
+    """
+
+    def _to_hold(self, row: StockHold) -> Hold:
+        return Hold(
+            id=row.id,
+            item_id=row.item_id,
+            renter_id=row.renter_id,
+            start_date=row.start_date,
+            end_date=row.end_date,
+            quantity=row.quantity,
+            expires_at=row.expires_at.replace(tzinfo=timezone.utc).timestamp(),
+        )
+
+    def held_quantity(
+        self,
+        db: Session,
+        item_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> int:
+        """Total quantity held on an item for holds overlapping the period."""
+        return self.held_quantities(db, [item_id], start_date, end_date).get(item_id, 0)
+
+    def held_quantities(
+        self,
+        db: Session,
+        item_ids: Iterable[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Dict[str, int]:
+        """`held_quantity` for many items in one query; items with nothing held are omitted."""
+        item_ids = list(item_ids)
+        if not item_ids:
+            return {}
+        start_date, end_date = _naive_utc(start_date), _naive_utc(end_date)
+        conditions = [StockHold.item_id.in_(item_ids), StockHold.expires_at > datetime.utcnow()]
+        if start_date:
+            conditions.append(StockHold.end_date >= start_date)
+        if end_date:
+            conditions.append(StockHold.start_date <= end_date)
+        return dict(
+            db.query(StockHold.item_id, func.sum(StockHold.quantity))
+            .filter(*conditions)
+            .group_by(StockHold.item_id)
+            .all()
+        )
+
+    def place(
+        self,
+        db: Session,
+        *,
+        item_id: str,
+        renter_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        quantity: int,
+        available: int,
+        ttl_seconds: Optional[int] = None,
+    ) -> Optional[Hold]:
+        """
+        Place a hold if `available` (stock minus overlapping rentals) still
+        covers it once the other live holds are subtracted. The caller holds
+        the item's row lock and commits.
+        """
+        start_date, end_date = _naive_utc(start_date), _naive_utc(end_date)
+        if quantity > available - self.held_quantity(db, item_id, start_date, end_date):
+            return None
+        row = StockHold(
+            id=str(uuid.uuid4()),
+            item_id=item_id,
+            renter_id=renter_id,
+            start_date=start_date,
+            end_date=end_date,
+            quantity=quantity,
+            expires_at=datetime.utcnow() + timedelta(seconds=_ttl(ttl_seconds)),
+        )
+        db.add(row)
+        db.flush()
+        return self._to_hold(row)
+
+    def get(self, db: Session, hold_id: str, renter_id: str) -> Optional[Hold]:
+        row = (
+            db.query(StockHold)
+            .filter(
+                StockHold.id == hold_id,
+                StockHold.renter_id == renter_id,
+                StockHold.expires_at > datetime.utcnow(),
+            )
+            .one_or_none()
+        )
+        return self._to_hold(row) if row is not None else None
+
+    def take(self, db: Session, hold_id: str, renter_id: str) -> Optional[Hold]:
+        """
+        Delete a renter's hold in the caller's transaction to convert it.
+        Of two concurrent takes of one hold, only one deletes the row.
+        """
+        hold = self.get(db, hold_id, renter_id)
+        if hold is None:
+            return None
+        deleted = (
+            db.query(StockHold)
+            .filter(StockHold.id == hold_id, StockHold.renter_id == renter_id)
+            .delete(synchronize_session=False)
+        )
+        return hold if deleted else None
+
+    def release(self, db: Session, hold_id: str, renter_id: str) -> Optional[Hold]:
+        """Remove a renter's hold."""
+        hold = self.take(db, hold_id, renter_id)
+        db.commit()
+        return hold
+
+    def restore(self, hold: Hold) -> None:
+        # The failed checkout's rollback already kept the row
+        pass
+
+    def prune(self, db: Session) -> int:
+        """Delete expired holds."""
+        deleted = (
+            db.query(StockHold)
+            .filter(StockHold.expires_at <= datetime.utcnow())
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+def create_store():
+    if settings.HOLDS_BACKEND == "database":
+        return DatabaseHoldStore()
+    return HoldStore(state_path=settings.HOLDS_STATE_PATH)
+
+
+hold = create_store()
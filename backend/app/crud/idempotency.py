@@ -0,0 +1,94 @@
+# backend/app/crud/idempotency.py
+"""
+CRUD operations for shared idempotency keys.
+Handles claiming a key, storing its response, releasing it, and pruning.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.idempotency_key import IdempotencyKey
+
+
+class CRUDIdempotency:
+    def get(self, db: Session, principal: str, key: str) -> Optional[IdempotencyKey]:
+        """The live row for a key: a claim (NULL status) or a stored response."""
+        row = db.get(IdempotencyKey, (principal, key))
+        if row is None or row.expires_at <= datetime.utcnow():
+            return None
+        return row
+
+    def claim(self, db: Session, principal: str, key: str, fingerprint: str,
+              lease_seconds: float) -> bool:
+        """
+        Claim a key for the caller's request. Returns False if another request
+        holds it or already stored a response; expired rows are reclaimed.
+        """
+        now = datetime.utcnow()
+        (
+            db.query(IdempotencyKey)
+            .filter(
+                IdempotencyKey.principal == principal,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at <= now,
+            )
+            .delete(synchronize_session=False)
+        )
+        db.add(IdempotencyKey(
+            principal=principal,
+            key=key,
+            fingerprint=fingerprint,
+            expires_at=now + timedelta(seconds=lease_seconds),
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return False
+        return True
+
+    def store(self, db: Session, principal: str, key: str, status: int, headers: str,
+              body: bytes, ttl_seconds: int) -> None:
+        (
+            db.query(IdempotencyKey)
+            .filter(IdempotencyKey.principal == principal, IdempotencyKey.key == key)
+            .update(
+                {
+                    IdempotencyKey.status: status,
+                    IdempotencyKey.headers: headers,
+                    IdempotencyKey.body: body,
+                    IdempotencyKey.expires_at: datetime.utcnow() + timedelta(seconds=ttl_seconds),
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+
+    def release(self, db: Session, principal: str, key: str) -> None:
+        """Drop a claim whose response was not stored, so a retry runs again."""
+        (
+            db.query(IdempotencyKey)
+            .filter(
+                IdempotencyKey.principal == principal,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status.is_(None),
+            )
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+
+    def prune(self, db: Session) -> int:
+        """Delete expired responses and abandoned claims."""
+        deleted = (
+            db.query(IdempotencyKey)
+            .filter(IdempotencyKey.expires_at <= datetime.utcnow())
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+idempotency = CRUDIdempotency()
@@ -5,14 +5,17 @@ Handles creation, updates, stock management, and retrieval.
 """
 
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 
 from ..crud.base import CRUDBase
 from ..models.item import Item
 from ..schemas.item import ItemCreate, ItemUpdate
 
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, text
 from ..models.rental import Rental
+from ..crud.hold import hold as crud_hold
+from ..crud.stock import stock as crud_stock
+from ..crud.pricing import price_cache
 from datetime import datetime
 
 
@@ -20,28 +23,99 @@ class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
     def get_by_owner(self, db: Session, owner_id: str) -> List[Item]:
         return db.query(Item).filter(Item.owner_id == owner_id).all()
 
-    def decrease_stock(self, db: Session, item_id: str, quantity: int) -> Optional[Item]:
+    def lock(self, db: Session, item_id: str) -> Optional[Item]:
+        """
+        Lock an item's row until the transaction ends and return the item.
+        Stock checks that are followed by a write (rentals, holds) run under
+        it, so two of them on one item never both pass on the same stock.
+        """
+        if db.get_bind().dialect.name == "sqlite":
+            # No FOR UPDATE on SQLite; a write takes the database write lock
+            db.execute(text("UPDATE items SET id = id WHERE id = :id"), {"id": item_id})
+            query = db.query(Item)
+        else:
+            query = db.query(Item).with_for_update()
+        return query.filter(Item.id == item_id).populate_existing().one_or_none()
+
+    def update(
+        self,
+        db: Session,
+        db_obj: Item,
+        obj_in: ItemUpdate | Dict[str, Any],
+    ) -> Item:
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+
+        # Stock lives in the ledger: a new available_stock becomes an adjustment
+        new_available = update_data.pop("available_stock", None)
+        if new_available is not None:
+            delta = new_available - crud_stock.get_available(db, db_obj.id)
+            if delta:
+                crud_stock.record(db, item_id=db_obj.id, delta=delta, reason="adjustment")
+
+        updated_item = super().update(db, db_obj=db_obj, obj_in=update_data)
+        price_cache.invalidate(updated_item.id)
+        return crud_stock.attach_available(db, [updated_item])[0]
+
+    def remove(self, db: Session, id: Any) -> Optional[Item]:
+        removed_item = super().remove(db, id=id)
+        price_cache.invalidate(id)
+        return removed_item
+
+    def decrease_stock(
+        self, db: Session, item_id: str, quantity: int, rental_id: Optional[str] = None
+    ) -> Optional[Item]:
         item = self.get(db, id=item_id)
-        if item and item.available_stock >= quantity:
-            item.available_stock -= quantity
-            db.add(item)
+        if item and crud_stock.get_available(db, item_id) >= quantity:
+            crud_stock.record(
+                db, item_id=item_id, delta=-quantity, reason="rental", rental_id=rental_id
+            )
             db.commit()
-            db.refresh(item)
             return item
         return None
 
-    def increase_stock(self, db: Session, item_id: str, quantity: int) -> Optional[Item]:
+    def increase_stock(
+        self, db: Session, item_id: str, quantity: int, rental_id: Optional[str] = None
+    ) -> Optional[Item]:
         item = self.get(db, id=item_id)
         if item:
-            item.available_stock += quantity
-            if item.available_stock > item.total_stock:
-                item.available_stock = item.total_stock
-            db.add(item)
-            db.commit()
-            db.refresh(item)
+            # Never restore above total_stock
+            delta = min(quantity, item.total_stock - crud_stock.get_available(db, item_id))
+            if delta > 0:
+                crud_stock.record(
+                    db, item_id=item_id, delta=delta, reason="return", rental_id=rental_id
+                )
+                db.commit()
             return item
         return None
-    
+
+    def increase_stock_many(
+        self, db: Session, restores: List[Tuple[str, int, Optional[str]]]
+    ) -> None:
+        """
+        Restore stock for many (item_id, quantity, rental_id) returns at once,
+        capped at each item's total_stock. Appends movements; the caller commits.
+        """
+        item_ids = {item_id for item_id, _, _ in restores}
+        if not item_ids:
+            return
+        total_stock = dict(
+            db.query(Item.id, Item.total_stock).filter(Item.id.in_(item_ids)).all()
+        )
+        available = crud_stock.get_available_many(db, item_ids)
+
+        movements = []
+        for item_id, quantity, rental_id in restores:
+            delta = min(quantity, total_stock.get(item_id, 0) - available.get(item_id, 0))
+            if delta > 0:
+                available[item_id] = available.get(item_id, 0) + delta
+                movements.append({
+                    "item_id": item_id, "delta": delta, "reason": "return", "rental_id": rental_id,
+                })
+        crud_stock.record_many(db, movements)
+
     def get_items_with_availability(
             self,
             db: Session,
@@ -61,9 +135,11 @@ class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
                 rental_filter_conditions.append(Rental.start_date <= end_date)
 
             # Calculate the quantity of items rented out during the period
-            rented_quantity = func.sum(Rental.quantity).filter(and_(*rental_filter_conditions))
+            rented_quantity = func.sum(Rental.quantity)
 
-            # The main query selects the Item and calculates its available stock
+            # The main query selects the Item and calculates its available stock.
+            # The rental conditions sit in the join so only overlapping active
+            # rentals are joined, not each item's whole rental history.
             query = (
                 db.query(
                     Item,
@@ -72,7 +148,7 @@ class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
                         "real_available_stock"
                     ),
                 )
-                .outerjoin(Rental, Rental.item_id == Item.id)
+                .outerjoin(Rental, and_(Rental.item_id == Item.id, *rental_filter_conditions))
                 .group_by(Item.id)
                 .offset(skip)
                 .limit(limit)
@@ -81,13 +157,20 @@ class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
             # The query returns a list of tuples: (Item, available_stock_count)
             query_results = query.all()
 
+            # Short-lived checkout holds for the whole page, in one lookup
+            held = crud_hold.held_quantities(
+                db, [item_obj.id for item_obj, _ in query_results], start_date, end_date
+            )
+
             # Process results to match the desired return type: List[Item]
             final_items = []
             for item_obj, available_stock in query_results:
-                # Dynamically attach the calculated stock to the item object
-                item_obj.real_available_stock = available_stock
+                # Dynamically attach the calculated stock to the item object,
+                # net of short-lived checkout holds
+                item_obj.real_available_stock = available_stock - held.get(item_obj.id, 0)
                 final_items.append(item_obj)
 
-            return final_items
+            # available_stock comes from the stock ledger, not the item row
+            return crud_stock.attach_available(db, final_items)
 
 item = CRUDItem(Item)
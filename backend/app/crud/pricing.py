@@ -0,0 +1,163 @@
+# backend/app/crud/pricing.py
+"""
+Rental pricing and batch quotes.
+Holds the single pricing rule shared by rental creation and quotes,
+plus a small per-item price cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..crud.hold import hold as crud_hold
+from ..models.item import Item
+from ..models.rental import Rental
+from ..schemas.quote import QuoteLine
+
+
+def rental_days(start_date: datetime, end_date: datetime) -> int:
+    """Billable days; both the start and the end day are charged."""
+    return (end_date - start_date).days + 1
+
+
+def rental_price(
+    start_date: datetime, end_date: datetime, price_per_day: float, quantity: int
+) -> float:
+    return rental_days(start_date, end_date) * price_per_day * quantity
+
+
+@dataclass(frozen=True)
+class ItemPricing:
+    price_per_day: float
+    total_stock: int
+    is_active: bool
+
+
+class PriceCache:
+    """
+    Bounded LRU of item pricing with a TTL. Entries are invalidated when an
+    item is updated in this process; the TTL bounds staleness across workers.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get_many(self, db: Session, item_ids: Iterable[str]) -> Dict[str, ItemPricing]:
+        now = time.monotonic()
+        found: Dict[str, ItemPricing] = {}
+        with self._lock:
+            for item_id in set(item_ids):
+                entry = self._entries.get(item_id)
+                if entry and entry[0] > now:
+                    self._entries.move_to_end(item_id)
+                    found[item_id] = entry[1]
+
+        missing = [item_id for item_id in set(item_ids) if item_id not in found]
+        if missing:
+            rows = (
+                db.query(Item.id, Item.price_per_day, Item.total_stock, Item.is_active)
+                .filter(Item.id.in_(missing))
+                .all()
+            )
+            with self._lock:
+                for item_id, price_per_day, total_stock, is_active in rows:
+                    pricing = ItemPricing(price_per_day, total_stock, bool(is_active))
+                    found[item_id] = pricing
+                    self._entries[item_id] = (now + self.ttl_seconds, pricing)
+                    self._entries.move_to_end(item_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return found
+
+    def invalidate(self, item_id: str) -> None:
+        with self._lock:
+            self._entries.pop(item_id, None)
+
+
+price_cache = PriceCache(
+    max_entries=settings.PRICE_CACHE_SIZE,
+    ttl_seconds=settings.PRICE_CACHE_TTL_SECONDS,
+)
+
+
+class CRUDPricing:
+    def _rented_per_line(self, db: Session, lines: List[QuoteLine]) -> List[int]:
+        """
+        Rented quantity overlapping each line, from one query over the
+        requested items' active rentals in the union of the line windows.
+        """
+        rentals = (
+            db.query(Rental.item_id, Rental.start_date, Rental.end_date, Rental.quantity)
+            .filter(
+                Rental.is_active == True,  # noqa: E712
+                Rental.item_id.in_({line.item_id for line in lines}),
+                Rental.end_date >= min(line.start_date for line in lines),
+                Rental.start_date <= max(line.end_date for line in lines),
+            )
+            .all()
+        )
+        by_item: Dict[str, list] = {}
+        for rental_row in rentals:
+            by_item.setdefault(rental_row.item_id, []).append(rental_row)
+
+        return [
+            sum(
+                rental_row.quantity
+                for rental_row in by_item.get(line.item_id, ())
+                if rental_row.end_date >= line.start_date and rental_row.start_date <= line.end_date
+            )
+            for line in lines
+        ]
+
+    def _held_per_line(self, db: Session, lines: List[QuoteLine]) -> List[int]:
+        """Held quantity overlapping each line, one lookup per distinct period."""
+        periods: Dict[Tuple[datetime, datetime], Set[str]] = {}
+        for line in lines:
+            periods.setdefault((line.start_date, line.end_date), set()).add(line.item_id)
+        held = {
+            period: crud_hold.held_quantities(db, item_ids, *period)
+            for period, item_ids in periods.items()
+        }
+        return [held[(line.start_date, line.end_date)].get(line.item_id, 0) for line in lines]
+
+    def quote(
+        self, db: Session, *, lines: List[QuoteLine], include_availability: bool = False
+    ) -> List[dict]:
+        """Price every line; optionally report the stock left for its period."""
+        if not lines:
+            return []
+        pricing = price_cache.get_many(db, [line.item_id for line in lines])
+        rented = self._rented_per_line(db, lines) if include_availability else None
+        held = self._held_per_line(db, lines) if include_availability else None
+
+        quoted = []
+        for index, line in enumerate(lines):
+            result = {**line.model_dump(), "days": rental_days(line.start_date, line.end_date)}
+            item_pricing: Optional[ItemPricing] = pricing.get(line.item_id)
+            if not item_pricing or not item_pricing.is_active:
+                result["error"] = "Item not found or inactive."
+            elif line.quantity <= 0 or line.end_date < line.start_date:
+                result["error"] = "Invalid quantity or dates."
+            else:
+                result["price_per_day"] = item_pricing.price_per_day
+                result["total_price"] = rental_price(
+                    line.start_date, line.end_date, item_pricing.price_per_day, line.quantity
+                )
+                if rented is not None:
+                    available = item_pricing.total_stock - rented[index] - held[index]
+                    result["available_stock"] = available
+                    result["is_available"] = line.quantity <= available
+            quoted.append(result)
+        return quoted
+
+
+pricing = CRUDPricing()
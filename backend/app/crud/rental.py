@@ -4,35 +4,80 @@ CRUD operations for Rental entity.
 Handles rental creation, validation, and returns.
 """
 
+import base64
+import json
+
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime, timedelta
 
+from ..core.config import settings
 from ..crud.base import CRUDBase
 from ..models.rental import Rental
 from ..schemas.rental import RentalCreate, RentalUpdate
+from ..schemas.hold import HoldCreate
 from ..crud.item import item as crud_item
-from sqlalchemy import and_, func
+from ..crud.hold import Hold, hold as crud_hold
+from ..crud.stock import stock as crud_stock
+from ..crud.rollup import rollup as crud_rollup
+from ..crud.pricing import rental_price
+from ..models.item import Item
+from ..models.rental_archive import ArchivedRental
+from sqlalchemy import and_, func, insert, literal, select, tuple_, union_all, update
+from sqlalchemy.engine import Row
+
+# Columns shared by live and archived rentals, as exposed in rental history
+HISTORY_COLUMNS = [
+    "id", "renter_id", "item_id", "start_date", "end_date", "quantity",
+    "total_price", "is_active", "owner_received", "created_at", "updated_at",
+]
+
+
+def _encode_cursor(start_date: datetime, rental_id: str) -> str:
+    raw = json.dumps([start_date.isoformat(), rental_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        start_date, rental_id = json.loads(raw)
+        return datetime.fromisoformat(start_date), str(rental_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+
 
 class CRUDRental(CRUDBase[Rental, RentalCreate, RentalUpdate]):
+    def _check_period(self, obj_in: RentalCreate) -> None:
+        """Reject bookings with a non-positive quantity or a bad or overlong period."""
+        if obj_in.quantity <= 0 or obj_in.end_date < obj_in.start_date:
+            raise ValueError("Invalid quantity or dates.")
+        # Dashboards only look back this far for rentals still out
+        if obj_in.end_date - obj_in.start_date > timedelta(days=settings.RENTAL_MAX_DAYS):
+            raise ValueError(f"Rentals can last at most {settings.RENTAL_MAX_DAYS} days.")
+
     def create_with_renter(
         self, db: Session, obj_in: RentalCreate, renter_id: str
     ) -> Optional[Rental]:
-        # Check if item exists and has enough stock
-        db_item = crud_item.get(db, id=obj_in.item_id)
-        if not db_item or db_item.available_stock < obj_in.quantity:
+        try:
+            self._check_period(obj_in)
+        except ValueError:
             return None
 
-        # Calculate rental price
-        rental_days = (obj_in.end_date - obj_in.start_date).days
-        if rental_days <= 0:
+        # Check if item exists and has enough stock
+        db_item = crud_item.get(db, id=obj_in.item_id)
+        if not db_item or crud_stock.get_available(db, db_item.id) < obj_in.quantity:
             return None
 
-        total_price = rental_days * db_item.price_per_day * obj_in.quantity
+        total_price = rental_price(
+            obj_in.start_date, obj_in.end_date, db_item.price_per_day, obj_in.quantity
+        )
 
         # Create rental
         db_obj = Rental(
             renter_id=renter_id,
             item_id=obj_in.item_id,
+            owner_id=db_item.owner_id,
             start_date=obj_in.start_date,
             end_date=obj_in.end_date,
             quantity=obj_in.quantity,
@@ -40,23 +85,72 @@ class CRUDRental(CRUDBase[Rental, RentalCreate, RentalUpdate]):
             is_active=True,
         )
         db.add(db_obj)
+        db.flush()
+        crud_rollup.record_created(db, db_obj)
 
         # Decrease stock
-        crud_item.decrease_stock(db, db_item.id, obj_in.quantity)
+        crud_item.decrease_stock(db, db_item.id, obj_in.quantity, rental_id=db_obj.id)
 
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def _transition(self, db: Session, rental_ids, conditions: list, values: dict) -> Set[str]:
+        """
+        Apply `values` to those of `rental_ids` that still match `conditions`
+        and return their ids. The UPDATE re-checks the conditions itself, so of
+        two concurrent calls only one changes (and gets back) a given rental.
+        """
+        rental_ids = list(rental_ids)
+        if not rental_ids:
+            return set()
+        where = [Rental.id.in_(rental_ids), *conditions]
+        if db.get_bind().dialect.update_returning:
+            stmt = (
+                update(Rental).where(*where).values(**values).returning(Rental.id)
+                .execution_options(synchronize_session=False)
+            )
+            return set(db.execute(stmt).scalars())
+        # No UPDATE ... RETURNING (MySQL): lock the matching rows first
+        changed = set(db.scalars(select(Rental.id).where(*where).with_for_update()))
+        if changed:
+            db.execute(
+                update(Rental).where(Rental.id.in_(changed)).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        return changed
+
+    def _end(self, db: Session, rental_ids) -> Set[str]:
+        return self._transition(
+            db, rental_ids, [Rental.is_active == True], {"is_active": False}  # noqa: E712
+        )
+
+    def _confirm(self, db: Session, rental_ids) -> Tuple[Set[str], Set[str]]:
+        """Confirm rentals; returns (confirmed, returned by the confirmation)."""
+        returned = self._transition(
+            db, rental_ids,
+            [Rental.owner_received == False, Rental.is_active == True],  # noqa: E712
+            {"owner_received": True, "is_active": False},
+        )
+        confirmed = returned | self._transition(
+            db, set(rental_ids) - returned,
+            [Rental.owner_received == False],  # noqa: E712
+            {"owner_received": True, "is_active": False},
+        )
+        return confirmed, returned
+
     def end_rental(self, db: Session, rental_id: str) -> Optional[Rental]:
         rental = self.get(db, id=rental_id)
         if not rental or not rental.is_active:
             return None
+        if not self._end(db, [rental.id]):
+            # Ended concurrently
+            db.rollback()
+            return None
 
-        rental.is_active = False
-        crud_item.increase_stock(db, rental.item_id, rental.quantity)
+        crud_rollup.record_ended(db, rental)
+        crud_item.increase_stock(db, rental.item_id, rental.quantity, rental_id=rental.id)
 
-        db.add(rental)
         db.commit()
         db.refresh(rental)
         return rental
@@ -67,75 +161,414 @@ class CRUDRental(CRUDBase[Rental, RentalCreate, RentalUpdate]):
             .filter(Rental.renter_id == renter_id, Rental.is_active == True)  # noqa: E712
             .all()
         )
-        
+
+    def _history_select(self, model, condition, *, status: Optional[str],
+                        item_id: Optional[str], start_date: Optional[datetime],
+                        end_date: Optional[datetime], after: Optional[Tuple[datetime, str]],
+                        limit: int):
+        """
+        One page of `model` rows matching `condition`, newest first. The
+        history indexes hold every column selected here, so filters and rows
+        both come from the index and the table is never read.
+        """
+        stmt = select(*[getattr(model, name) for name in HISTORY_COLUMNS]).where(condition)
+        if status == "active":
+            stmt = stmt.where(model.is_active == True)  # noqa: E712
+        elif status == "ended":
+            stmt = stmt.where(model.is_active == False)  # noqa: E712
+        elif status == "confirmed":
+            stmt = stmt.where(model.owner_received == True)  # noqa: E712
+        if item_id:
+            stmt = stmt.where(model.item_id == item_id)
+        # Rentals overlapping the period
+        if start_date:
+            stmt = stmt.where(model.end_date >= start_date)
+        if end_date:
+            stmt = stmt.where(model.start_date <= end_date)
+        if after:
+            stmt = stmt.where(tuple_(model.start_date, model.id) < tuple_(*after))
+        stmt = stmt.order_by(model.start_date.desc(), model.id.desc()).limit(limit)
+        # Wrapped so the page can be a member of a UNION on every dialect
+        page = stmt.subquery()
+        return select(*page.c)
+
+    def _history_page(self, db: Session, selects: list, limit: int) -> Tuple[List[Row], Optional[str]]:
+        if not selects:
+            return [], None
+        history = union_all(*selects).subquery() if len(selects) > 1 else selects[0].subquery()
+        rows = db.execute(
+            select(history)
+            .order_by(history.c.start_date.desc(), history.c.id.desc())
+            .limit(limit + 1)
+        ).all()
+        if len(rows) <= limit:
+            return rows, None
+        last = rows[limit - 1]
+        return rows[:limit], _encode_cursor(last.start_date, last.id)
+
+    def get_history(
+        self,
+        db: Session,
+        *,
+        renter_id: str,
+        status: Optional[str] = None,
+        item_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> Tuple[List[Row], Optional[str]]:
+        """
+        A page of a renter's rentals, newest first, from both the live table
+        and the archive. Returns the rows and the cursor of the next page.
+        """
+        after = _decode_cursor(cursor) if cursor else None
+        filters = dict(status=status, item_id=item_id, start_date=start_date,
+                       end_date=end_date, after=after, limit=limit + 1)
+        selects = [
+            self._history_select(model, model.renter_id == renter_id, **filters)
+            for model in (Rental, ArchivedRental)
+        ]
+        return self._history_page(db, selects, limit)
+
+    def get_owner_history(
+        self,
+        db: Session,
+        *,
+        owner_id: str,
+        status: Optional[str] = None,
+        item_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> Tuple[List[Row], Optional[str]]:
+        """
+        A page of rentals of an owner's items, newest first, from both the
+        live table and the archive. Rentals carry their item's owner, so each
+        table is one keyset seek on its owner history index, like renters'.
+        """
+        after = _decode_cursor(cursor) if cursor else None
+        filters = dict(status=status, item_id=item_id, start_date=start_date,
+                       end_date=end_date, after=after, limit=limit + 1)
+        selects = [
+            self._history_select(model, model.owner_id == owner_id, **filters)
+            for model in (Rental, ArchivedRental)
+        ]
+        return self._history_page(db, selects, limit)
+
+    def archive_ended(self, db: Session, *, older_than: datetime, batch_size: int = 1000) -> int:
+        """
+        Move rentals that ended and were confirmed by the owner before
+        `older_than` into the archive table, one INSERT ... SELECT and one
+        DELETE per batch. Returns the number of rentals archived.
+        """
+        columns = [c.name for c in ArchivedRental.__table__.columns if c.name != "archived_at"]
+        archived = 0
+        while True:
+            # Retention runs from the last state change (the return or the
+            # confirmation), not the planned end date, so late returns stay
+            ids = [
+                rental_id for (rental_id,) in db.query(Rental.id)
+                .filter(
+                    Rental.is_active == False,  # noqa: E712
+                    Rental.owner_received == True,  # noqa: E712
+                    Rental.updated_at < older_than,
+                )
+                .limit(batch_size)
+            ]
+            if not ids:
+                break
+            db.execute(
+                insert(ArchivedRental).from_select(
+                    columns + ["archived_at"],
+                    select(
+                        *[getattr(Rental, name) for name in columns],
+                        literal(datetime.utcnow()),
+                    ).where(Rental.id.in_(ids)),
+                )
+            )
+            db.query(Rental).filter(Rental.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            archived += len(ids)
+            if len(ids) < batch_size:
+                break
+        return archived
+
+
     def confirm_owner_received(self, db: Session, rental_id: str) -> Optional[Rental]:
         rental = self.get(db, id=rental_id)
         if not rental or rental.owner_received:
             return None
-        rental.owner_received = True
-        rental.is_active = False
+        confirmed, returned = self._confirm(db, [rental.id])
+        if not confirmed:
+            # Confirmed concurrently
+            db.rollback()
+            return None
+
+        crud_rollup.record_confirmed(db, rental)
 
-        # increase stock
-        crud_item.increase_stock(db, rental.item_id, rental.quantity)
+        # increase stock, unless the renter already ended the rental
+        if returned:
+            crud_rollup.record_ended(db, rental)
+            crud_item.increase_stock(db, rental.item_id, rental.quantity, rental_id=rental.id)
 
-        db.add(rental)
         db.commit()
         db.refresh(rental)
         return rental
     
-    def create_with_availability_check(
+    def process_batch(
+        self, db: Session, *, rental_ids: List[str], user_id: str, action: str
+    ) -> List[dict]:
+        """
+        End (as renter) or confirm (as item owner) many rentals in one transaction.
+
+        Ownership is checked with a single joined query; state changes, stock
+        restores and rollup counts are each applied with set-based statements,
+        counting only the rentals this call actually changed. Returns the
+        status (and item, when processed) per rental id.
+        """
+        rental_ids = list(dict.fromkeys(rental_ids))
+        rows = (
+            db.query(
+                Rental.id, Rental.item_id, Rental.renter_id, Rental.quantity,
+                Rental.start_date, Rental.end_date, Rental.is_active,
+                Rental.owner_received, Item.owner_id,
+            )
+            .join(Item, Item.id == Rental.item_id)
+            .filter(Rental.id.in_(rental_ids))
+            .all()
+        )
+        found = {row.id: row for row in rows}
+
+        statuses: Dict[str, str] = {}
+        for rental_id in rental_ids:
+            row = found.get(rental_id)
+            if action == "end":
+                if not row or row.renter_id != user_id:
+                    statuses[rental_id] = "not_found"
+                elif not row.is_active:
+                    statuses[rental_id] = "not_active"
+                else:
+                    statuses[rental_id] = "ended"
+            else:
+                if not row:
+                    statuses[rental_id] = "not_found"
+                elif row.owner_id != user_id:
+                    statuses[rental_id] = "forbidden"
+                elif row.owner_received:
+                    statuses[rental_id] = "already_confirmed"
+                else:
+                    statuses[rental_id] = "confirmed"
+
+        accepted = [rental_id for rental_id, status in statuses.items()
+                    if status in ("ended", "confirmed")]
+        if accepted:
+            # Rentals changed concurrently since the read above are reported
+            # as they are now and left alone
+            if action == "end":
+                changed = returned = self._end(db, accepted)
+                lost = "not_active"
+            else:
+                changed, returned = self._confirm(db, accepted)
+                lost = "already_confirmed"
+            for rental_id in accepted:
+                if rental_id not in changed:
+                    statuses[rental_id] = lost
+
+            # Stock comes back only for rentals that were still out
+            returned_rows = [found[rental_id] for rental_id in accepted if rental_id in returned]
+            crud_item.increase_stock_many(
+                db, [(row.item_id, row.quantity, row.id) for row in returned_rows]
+            )
+            crud_rollup.record_returned(db, returned_rows)
+            if action == "confirm":
+                crud_rollup.record_events(db, [
+                    (found[rental_id].item_id, "confirmations_count")
+                    for rental_id in accepted if rental_id in changed
+                ])
+            db.commit()
+
+        processed = ("ended", "confirmed")
+        return [
+            {
+                "rental_id": rental_id,
+                "status": status,
+                "item_id": found[rental_id].item_id if status in processed else None,
+            }
+            for rental_id, status in statuses.items()
+        ]
+
+    def get_rented_quantity(
         self,
         db: Session,
-        *,
-        obj_in: RentalCreate,
-        renter_id: str
-    ) -> Rental:
+        item_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> int:
         """
-        Create a rental only if enough real-time stock is available for the requested period.
+        Quantity of an item tied up in active rentals overlapping the period.
         """
-        # 1. Fetch the item
-        item_obj = crud_item.get(db, id=obj_in.item_id)
-        if not item_obj or not item_obj.is_active:
-            raise ValueError("Item not found or inactive.")
-
-        # 2. Calculate real-time available stock for requested dates
-        rental_filter_conditions = [Rental.is_active == True, Rental.item_id == obj_in.item_id]
-        if obj_in.start_date:
-            rental_filter_conditions.append(Rental.end_date >= obj_in.start_date)
-        if obj_in.end_date:
-            rental_filter_conditions.append(Rental.start_date <= obj_in.end_date)
+        rental_filter_conditions = [Rental.is_active == True, Rental.item_id == item_id]
+        if start_date:
+            rental_filter_conditions.append(Rental.end_date >= start_date)
+        if end_date:
+            rental_filter_conditions.append(Rental.start_date <= end_date)
 
-        rented_quantity = db.query(
+        return db.query(
             func.coalesce(func.sum(Rental.quantity), 0)
         ).filter(and_(*rental_filter_conditions)).scalar()
 
-        real_available_stock = item_obj.total_stock - rented_quantity
-
-        if obj_in.quantity > real_available_stock:
-            raise ValueError("Not enough stock available for the selected period.")
+    def get_available_quantity(
+        self,
+        db: Session,
+        item_obj: Item,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> int:
+        """
+        Stock left for the period after overlapping active rentals and live holds.
+        """
+        rented_quantity = self.get_rented_quantity(db, item_obj.id, start_date, end_date)
+        held_quantity = crud_hold.held_quantity(db, item_obj.id, start_date, end_date)
+        return item_obj.total_stock - rented_quantity - held_quantity
 
-        # 3. Calculate total price
-        days = (obj_in.end_date - obj_in.start_date).days + 1
-        total_price = days * item_obj.price_per_day * obj_in.quantity
+    def _add_for_item(
+        self, db: Session, *, item_obj: Item, obj_in: RentalCreate, renter_id: str
+    ) -> Rental:
+        # Calculate total price
+        total_price = rental_price(
+            obj_in.start_date, obj_in.end_date, item_obj.price_per_day, obj_in.quantity
+        )
 
-        # 4. Create rental
         db_obj = Rental(
             renter_id=renter_id,
             item_id=obj_in.item_id,
+            owner_id=item_obj.owner_id,
             start_date=obj_in.start_date,
             end_date=obj_in.end_date,
             quantity=obj_in.quantity,
             total_price=total_price
         )
         db.add(db_obj)
+        db.flush()
+        crud_rollup.record_created(db, db_obj)
+
+        # Append to the stock ledger instead of rewriting the item row
+        crud_stock.record(
+            db, item_id=item_obj.id, delta=-obj_in.quantity, reason="rental", rental_id=db_obj.id
+        )
+        return db_obj
+
+    def _create_for_item(
+        self, db: Session, *, item_obj: Item, obj_in: RentalCreate, renter_id: str
+    ) -> Rental:
+        db_obj = self._add_for_item(db, item_obj=item_obj, obj_in=obj_in, renter_id=renter_id)
         db.commit()
         db.refresh(db_obj)
 
-        # 5. Reduce available_stock (optional, for faster frontend queries)
-        item_obj.available_stock -= obj_in.quantity
-        db.add(item_obj)
-        db.commit()
+        return db_obj
 
+    def create_with_availability_check(
+        self,
+        db: Session,
+        *,
+        obj_in: RentalCreate,
+        renter_id: str
+    ) -> Rental:
+        """
+        Create a rental only if enough real-time stock is available for the requested period.
+        The check and the insert run under the item's row lock, shared with
+        `place_hold` and `create_from_hold`, which the commit releases.
+        """
+        self._check_period(obj_in)
+
+        # 1. Fetch and lock the item
+        item_obj = crud_item.lock(db, obj_in.item_id)
+        if not item_obj or not item_obj.is_active:
+            db.rollback()
+            raise ValueError("Item not found or inactive.")
+
+        # 2. Calculate real-time available stock for requested dates
+        real_available_stock = self.get_available_quantity(
+            db, item_obj, obj_in.start_date, obj_in.end_date
+        )
+
+        if obj_in.quantity > real_available_stock:
+            db.rollback()
+            raise ValueError("Not enough stock available for the selected period.")
+
+        # 3. Price and create the rental
+        return self._create_for_item(db, item_obj=item_obj, obj_in=obj_in, renter_id=renter_id)
+
+    def place_hold(self, db: Session, *, obj_in: HoldCreate, renter_id: str) -> Hold:
+        """
+        Reserve stock for a short time without creating a rental.
+        """
+        self._check_period(obj_in)
+        if obj_in.ttl_seconds is not None and obj_in.ttl_seconds <= 0:
+            raise ValueError("Hold TTL must be positive.")
+        item_obj = crud_item.lock(db, obj_in.item_id)
+        try:
+            if not item_obj or not item_obj.is_active:
+                raise ValueError("Item not found or inactive.")
+
+            # Rentals are read under the item's lock, outside the hold store's
+            available = item_obj.total_stock - self.get_rented_quantity(
+                db, item_obj.id, obj_in.start_date, obj_in.end_date
+            )
+            hold_obj = crud_hold.place(
+                db,
+                item_id=item_obj.id,
+                renter_id=renter_id,
+                start_date=obj_in.start_date,
+                end_date=obj_in.end_date,
+                quantity=obj_in.quantity,
+                available=available,
+                ttl_seconds=obj_in.ttl_seconds,
+            )
+            if not hold_obj:
+                raise ValueError("Not enough stock available for the selected period.")
+        finally:
+            # Ends the critical section
+            db.commit()
+        return hold_obj
+
+    def create_from_hold(self, db: Session, *, hold_id: str, renter_id: str) -> Rental:
+        """
+        Turn a live hold into a rental. The stock was already reserved when the
+        hold was placed, so no availability aggregate is run here.
+        """
+        hold_obj = crud_hold.get(db, hold_id, renter_id=renter_id)
+        if not hold_obj:
+            raise ValueError("Hold not found or expired.")
+        # Locked like a plain rental, so no availability check sees the hold
+        # taken before the rental that replaces it is committed
+        item_obj = crud_item.lock(db, hold_obj.item_id)
+        if not item_obj or not item_obj.is_active:
+            db.rollback()
+            raise ValueError("Item not found or inactive.")
+
+        obj_in = RentalCreate(
+            item_id=hold_obj.item_id,
+            start_date=hold_obj.start_date,
+            end_date=hold_obj.end_date,
+            quantity=hold_obj.quantity,
+        )
+        db_obj = self._add_for_item(db, item_obj=item_obj, obj_in=obj_in, renter_id=renter_id)
+
+        # The hold is taken only once the rental is ready to commit, so a failed
+        # checkout leaves it in place. Taking it is atomic: of two concurrent
+        # checkouts of one hold, only one gets here.
+        if not crud_hold.take(db, hold_id, renter_id=renter_id):
+            db.rollback()
+            raise ValueError("Hold not found or expired.")
+        try:
+            db.commit()
+        except Exception:
+            crud_hold.restore(hold_obj)
+            raise
+        db.refresh(db_obj)
         return db_obj
 
 
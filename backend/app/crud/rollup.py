@@ -0,0 +1,274 @@
+# backend/app/crud/rollup.py
+"""
+CRUD operations for owner revenue and utilization rollups.
+Handles incremental updates on rental events, dashboards, and backfill.
+
+Rented units are stored as day-bucket deltas (+quantity on the first day
+out, -quantity on the day after the last), so a rental writes a fixed number
+of rows whatever its length; dashboards add them up into unit-days.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from importlib import import_module
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..crud.item import item as crud_item
+from ..models.item_rollup import ItemRollup
+from ..models.rental import Rental
+from ..models.rental_archive import ArchivedRental
+
+METRICS = ("rentals_count", "revenue", "unit_delta", "returns_count", "confirmations_count")
+# Counters reported as they are stored; rented_unit_days is derived from unit_delta
+COUNTERS = ("rentals_count", "revenue", "returns_count", "confirmations_count")
+BUCKET_DAYS = {"day": 1, "week": 7}
+
+# (item_id, granularity, bucket_start) -> metric -> increment
+Increments = Dict[Tuple[str, str, date], Dict[str, float]]
+
+UPSERT_CHUNK_SIZE = 100
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """First day of the bucket containing `day`; weeks start on Monday."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def _new_increments() -> Increments:
+    return defaultdict(lambda: defaultdict(float))
+
+
+def _add(increments: Increments, item_id: str, day: date, metric: str, amount: float) -> None:
+    for granularity in BUCKET_DAYS:
+        increments[(item_id, granularity, bucket_start(day, granularity))][metric] += amount
+
+
+def _add_units_out(increments: Increments, rental, first: date, stop: date, sign: int) -> None:
+    # Units out on every day from `first` up to, not including, `stop`
+    if stop > first:
+        increments[(rental.item_id, "day", first)]["unit_delta"] += sign * rental.quantity
+        increments[(rental.item_id, "day", stop)]["unit_delta"] -= sign * rental.quantity
+
+
+def _add_created(increments: Increments, rental) -> None:
+    # Revenue is booked on the start day, so future rentals only show up in
+    # dashboards once their start date is in the requested period
+    start, end = rental.start_date.date(), rental.end_date.date()
+    _add(increments, rental.item_id, start, "rentals_count", 1)
+    _add(increments, rental.item_id, start, "revenue", rental.total_price)
+    _add_units_out(increments, rental, start, end + timedelta(days=1), 1)
+
+
+def _add_returned(increments: Increments, rental, at: datetime) -> None:
+    # An early return gives back the days after the return day
+    day = at.date()
+    _add(increments, rental.item_id, day, "returns_count", 1)
+    start, stop = rental.start_date.date(), rental.end_date.date() + timedelta(days=1)
+    _add_units_out(increments, rental, max(start, min(stop, day + timedelta(days=1))), stop, -1)
+
+
+class CRUDRollup:
+    def _apply(self, db: Session, increments: Increments) -> None:
+        """Add increments to their rollup rows with one upsert per chunk."""
+        rows = [
+            {
+                "item_id": item_id,
+                "granularity": granularity,
+                "bucket_start": bucket,
+                **{
+                    metric: values.get(metric, 0) if metric == "revenue"
+                    else int(values.get(metric, 0))
+                    for metric in METRICS
+                },
+            }
+            for (item_id, granularity, bucket), values in increments.items()
+        ]
+        table = ItemRollup.__table__
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql", "mysql", "mariadb"):
+            # Only the dialect in use is imported
+            insert_fn = import_module(
+                f"sqlalchemy.dialects.{'mysql' if dialect == 'mariadb' else dialect}"
+            ).insert
+
+        for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            chunk = rows[i:i + UPSERT_CHUNK_SIZE]
+            if dialect in ("sqlite", "postgresql"):
+                stmt = insert_fn(table).values(chunk)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.item_id, table.c.granularity, table.c.bucket_start],
+                    set_={metric: table.c[metric] + stmt.excluded[metric] for metric in METRICS},
+                )
+                db.execute(stmt)
+            elif dialect in ("mysql", "mariadb"):
+                stmt = insert_fn(table).values(chunk)
+                stmt = stmt.on_duplicate_key_update(
+                    {metric: table.c[metric] + stmt.inserted[metric] for metric in METRICS}
+                )
+                db.execute(stmt)
+            else:
+                for row in chunk:
+                    key = (row["item_id"], row["granularity"], row["bucket_start"])
+                    rollup = db.get(ItemRollup, key)
+                    if rollup is None:
+                        db.add(ItemRollup(**row))
+                        continue
+                    for metric in METRICS:
+                        setattr(rollup, metric, getattr(rollup, metric) + row[metric])
+
+    # --- Incremental updates (the caller commits with the rental change) ---
+    def record_created(self, db: Session, rental: Rental) -> None:
+        increments = _new_increments()
+        _add_created(increments, rental)
+        self._apply(db, increments)
+
+    def record_events(
+        self, db: Session, events: List[Tuple[str, str]], at: Optional[datetime] = None
+    ) -> None:
+        """Count (item_id, metric) events such as returns in one upsert."""
+        day = (at or datetime.utcnow()).date()
+        increments = _new_increments()
+        for item_id, metric in events:
+            _add(increments, item_id, day, metric, 1)
+        self._apply(db, increments)
+
+    def record_returned(self, db: Session, rentals: List, at: Optional[datetime] = None) -> None:
+        """Count returns and release the unused rented days of early ones."""
+        at = at or datetime.utcnow()
+        increments = _new_increments()
+        for rental in rentals:
+            _add_returned(increments, rental, at)
+        self._apply(db, increments)
+
+    def record_ended(self, db: Session, rental: Rental, at: Optional[datetime] = None) -> None:
+        self.record_returned(db, [rental], at=at)
+
+    def record_confirmed(self, db: Session, rental: Rental, at: Optional[datetime] = None) -> None:
+        self.record_events(db, [(rental.item_id, "confirmations_count")], at=at)
+
+    # --- Reads ---
+    def get_owner_dashboard(
+        self,
+        db: Session,
+        *,
+        owner_id: str,
+        granularity: str,
+        start_date: date,
+        end_date: date,
+    ) -> List[dict]:
+        """
+        Rollup rows for every item of an owner in the period, with utilization
+        as the share of the item's stock-days that were rented. Revenue and
+        rental counts are bucketed by rental start date. Rented unit-days are
+        summed from the day deltas, so a bucket inside a long rental is
+        reported even though the rental wrote no row for it.
+        """
+        total_stock = {
+            item_obj.id: item_obj.total_stock
+            for item_obj in crud_item.get_by_owner(db, owner_id=owner_id)
+        }
+        if not total_stock:
+            return []
+        first_day = bucket_start(start_date, granularity)
+        last_day = bucket_start(end_date, granularity) + timedelta(days=BUCKET_DAYS[granularity] - 1)
+
+        rollups = {
+            (rollup.item_id, rollup.bucket_start): rollup
+            for rollup in db.query(ItemRollup).filter(
+                ItemRollup.item_id.in_(total_stock),
+                ItemRollup.granularity == granularity,
+                ItemRollup.bucket_start >= first_day,
+                ItemRollup.bucket_start <= end_date,
+            )
+        }
+
+        # Units already out when the period starts. A rental's two deltas are
+        # at most RENTAL_MAX_DAYS + 1 days apart, so older deltas cancel out.
+        day_rows = ItemRollup.granularity == "day"
+        opening = dict(
+            db.query(ItemRollup.item_id, func.sum(ItemRollup.unit_delta))
+            .filter(
+                ItemRollup.item_id.in_(total_stock),
+                day_rows,
+                ItemRollup.bucket_start >= first_day - timedelta(days=settings.RENTAL_MAX_DAYS + 1),
+                ItemRollup.bucket_start < first_day,
+            )
+            .group_by(ItemRollup.item_id)
+            .all()
+        )
+        deltas = {
+            (item_id, day): delta
+            for item_id, day, delta in db.query(
+                ItemRollup.item_id, ItemRollup.bucket_start, ItemRollup.unit_delta
+            ).filter(
+                ItemRollup.item_id.in_(total_stock),
+                day_rows,
+                ItemRollup.bucket_start >= first_day,
+                ItemRollup.bucket_start <= last_day,
+                ItemRollup.unit_delta != 0,
+            )
+        }
+
+        unit_days: Dict[Tuple[str, date], int] = defaultdict(int)
+        for item_id in total_stock:
+            units_out = opening.get(item_id) or 0
+            day = first_day
+            while day <= last_day:
+                units_out += deltas.get((item_id, day), 0)
+                if units_out:
+                    unit_days[(item_id, bucket_start(day, granularity))] += units_out
+                day += timedelta(days=1)
+
+        result = []
+        for item_id, bucket in sorted(set(rollups) | set(unit_days)):
+            rollup = rollups.get((item_id, bucket))
+            rented_unit_days = unit_days.get((item_id, bucket), 0)
+            capacity = total_stock[item_id] * BUCKET_DAYS[granularity]
+            result.append({
+                "item_id": item_id,
+                "granularity": granularity,
+                "bucket_start": bucket,
+                **{metric: getattr(rollup, metric) if rollup else 0 for metric in COUNTERS},
+                "rented_unit_days": rented_unit_days,
+                "utilization": (
+                    round(100.0 * rented_unit_days / capacity, 2) if capacity else 0.0
+                ),
+            })
+        return result
+
+    # --- Backfill ---
+    def backfill(self, db: Session) -> int:
+        """
+        Rebuild all rollups from live and archived rentals. Return and
+        confirmation buckets use the rental's last update time when known.
+        Returns the number of rollup rows written.
+        """
+        increments = _new_increments()
+        for model in (Rental, ArchivedRental):
+            stmt = select(
+                model.item_id, model.start_date, model.end_date, model.quantity,
+                model.total_price, model.is_active, model.owner_received,
+                model.updated_at,
+            ).execution_options(yield_per=1000)
+            for row in db.execute(stmt):
+                _add_created(increments, row)
+                event_at = row.updated_at or row.end_date
+                if not row.is_active:
+                    _add_returned(increments, row, event_at)
+                if row.owner_received:
+                    _add(increments, row.item_id, event_at.date(), "confirmations_count", 1)
+
+        db.query(ItemRollup).delete(synchronize_session=False)
+        self._apply(db, increments)
+        db.commit()
+        return len(increments)
+
+
+rollup = CRUDRollup()
@@ -0,0 +1,182 @@
+# backend/app/crud/stock.py
+"""
+CRUD operations for the append-only stock ledger.
+Handles movement recording, ledger reads, compaction, and reconciliation.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..core.config import settings
+from ..models.item import Item
+from ..models.rental import Rental
+from ..models.stock_ledger import StockMovement, StockSnapshot
+
+
+class CRUDStock:
+    """
+    Available stock is the item's snapshot (or, before its first compaction,
+    the opening `Item.available_stock`) plus the un-compacted movement tail.
+    """
+
+    def record(
+        self,
+        db: Session,
+        *,
+        item_id: str,
+        delta: int,
+        reason: str,
+        rental_id: Optional[str] = None,
+    ) -> StockMovement:
+        """Append a movement to the session; the caller commits."""
+        movement = StockMovement(item_id=item_id, delta=delta, reason=reason, rental_id=rental_id)
+        db.add(movement)
+        return movement
+
+    def record_many(self, db: Session, movements: List[dict]) -> None:
+        """Append many movements with a single executemany INSERT; the caller commits."""
+        if movements:
+            db.execute(insert(StockMovement), movements)
+
+    def _available_query(
+        self,
+        db: Session,
+        item_ids: Optional[List[str]] = None,
+        up_to_id: Optional[int] = None,
+        only_with_tail: bool = False,
+    ):
+        tail_conditions = [
+            StockMovement.id > func.coalesce(StockSnapshot.last_movement_id, 0)
+        ]
+        if item_ids is not None:
+            tail_conditions.append(StockMovement.item_id.in_(item_ids))
+        if up_to_id is not None:
+            tail_conditions.append(StockMovement.id <= up_to_id)
+        tail = (
+            db.query(
+                StockMovement.item_id.label("item_id"),
+                func.sum(StockMovement.delta).label("delta"),
+            )
+            .outerjoin(StockSnapshot, StockSnapshot.item_id == StockMovement.item_id)
+            .filter(and_(*tail_conditions))
+            .group_by(StockMovement.item_id)
+            .subquery()
+        )
+        baseline = func.coalesce(StockSnapshot.available_stock, Item.available_stock)
+        query = db.query(
+            Item.id,
+            (baseline + func.coalesce(tail.c.delta, 0)).label("available_stock"),
+        ).outerjoin(StockSnapshot, StockSnapshot.item_id == Item.id)
+        if item_ids is not None:
+            query = query.filter(Item.id.in_(item_ids))
+        if only_with_tail:
+            return query.join(tail, tail.c.item_id == Item.id)
+        return query.outerjoin(tail, tail.c.item_id == Item.id)
+
+    def get_available_many(self, db: Session, item_ids: Iterable[str]) -> Dict[str, int]:
+        item_ids = list(item_ids)
+        if not item_ids:
+            return {}
+        return dict(self._available_query(db, item_ids=item_ids).all())
+
+    def get_available(self, db: Session, item_id: str) -> int:
+        return self.get_available_many(db, [item_id]).get(item_id, 0)
+
+    def attach_available(self, db: Session, items: List[Item]) -> List[Item]:
+        """
+        Expose ledger stock as `available_stock` on loaded items without
+        marking them dirty, so serializing them never rewrites the item row.
+        """
+        available = self.get_available_many(db, [item_obj.id for item_obj in items])
+        for item_obj in items:
+            set_committed_value(item_obj, "available_stock", available.get(item_obj.id, 0))
+        return items
+
+    def compact(self, db: Session, settle_seconds: Optional[int] = None) -> int:
+        """
+        Fold settled movements into per-item snapshots. Movements younger than
+        `settle_seconds` are left in the tail so that a slow transaction cannot
+        commit an id below the new watermark. Returns the number of items folded.
+        """
+        if settle_seconds is None:
+            settle_seconds = settings.STOCK_LEDGER_SETTLE_SECONDS
+        cutoff = datetime.utcnow() - timedelta(seconds=settle_seconds)
+        up_to_id = (
+            db.query(func.max(StockMovement.id))
+            .filter(StockMovement.created_at <= cutoff)
+            .scalar()
+        )
+        if not up_to_id:
+            return 0
+
+        folded = dict(self._available_query(db, up_to_id=up_to_id, only_with_tail=True).all())
+        if not folded:
+            return 0
+
+        snapshots = {
+            snapshot.item_id: snapshot
+            for snapshot in db.query(StockSnapshot).filter(StockSnapshot.item_id.in_(folded))
+        }
+        now = datetime.utcnow()
+        for item_id, available in folded.items():
+            snapshot = snapshots.get(item_id) or StockSnapshot(item_id=item_id)
+            snapshot.available_stock = available
+            snapshot.last_movement_id = up_to_id
+            snapshot.compacted_at = now
+            db.add(snapshot)
+        db.commit()
+        return len(folded)
+
+    def prune(self, db: Session, older_than: datetime) -> int:
+        """
+        Delete movements already folded into a snapshot and older than the
+        audit retention window. Returns the number of rows deleted.
+        """
+        watermark = (
+            db.query(StockSnapshot.last_movement_id)
+            .filter(StockSnapshot.item_id == StockMovement.item_id)
+            .scalar_subquery()
+        )
+        deleted = (
+            db.query(StockMovement)
+            .filter(StockMovement.created_at < older_than, StockMovement.id <= watermark)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+    def reconcile(self, db: Session, apply: bool = False) -> List[dict]:
+        """
+        Compare ledger stock with `total_stock - active rentals` for every item.
+        With `apply`, append a correcting movement for each drifting item.
+        """
+        rented = (
+            db.query(Rental.item_id, func.sum(Rental.quantity).label("quantity"))
+            .filter(Rental.is_active == True)  # noqa: E712
+            .group_by(Rental.item_id)
+            .subquery()
+        )
+        expected_rows = (
+            db.query(Item.id, Item.total_stock - func.coalesce(rented.c.quantity, 0))
+            .outerjoin(rented, rented.c.item_id == Item.id)
+            .all()
+        )
+        current = dict(self._available_query(db).all())
+
+        drift = []
+        for item_id, expected in expected_rows:
+            ledger = current.get(item_id, 0)
+            if ledger != expected:
+                drift.append({"item_id": item_id, "ledger": ledger, "expected": expected})
+                if apply:
+                    self.record(db, item_id=item_id, delta=expected - ledger, reason="reconcile")
+        if apply and drift:
+            db.commit()
+        return drift
+
+
+stock = CRUDStock()
@@ -0,0 +1,97 @@
+# backend/app/crud/token.py
+"""
+CRUD operations for the token denylist.
+Handles revocation, refresh-token rotation with reuse detection, and pruning.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.revocation import revocations
+from ..db.session import SessionLocal
+from ..models.revoked_token import RevokedToken
+
+# Re-read a little before the last sync so revocations committed by other
+# workers with slightly older timestamps are not missed
+SYNC_OVERLAP = timedelta(seconds=60)
+
+# Revocations checked on every request, mirrored in each worker's memory
+REVOKED = "revoked"
+# Spent refresh tokens, only ever looked up here when a refresh token is used
+SPENT = "spent"
+
+
+def _expiry(payload: dict) -> datetime:
+    return datetime.utcfromtimestamp(payload["exp"])
+
+
+class CRUDToken:
+    def revoke(self, db: Session, jti: str, expires_at: datetime) -> None:
+        if db.get(RevokedToken, jti) is None:
+            db.add(RevokedToken(jti=jti, expires_at=expires_at, kind=REVOKED))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Revoked concurrently; the row is there either way
+                db.rollback()
+        revocations.add(jti, expires_at)
+
+    def revoke_session(self, db: Session, payload: dict) -> None:
+        """Revoke every token of the login session the given token belongs to."""
+        # Refresh tokens outlive access tokens, so keep the row that long
+        expires_at = max(_expiry(payload), datetime.utcnow() + settings.refresh_token_expiry)
+        self.revoke(db, payload["fam"], expires_at)
+
+    def rotate(self, db: Session, payload: dict) -> bool:
+        """
+        Spend a refresh token. Returns False if its session was revoked or the
+        token was already spent; reuse of a spent token revokes the session.
+        """
+        if db.get(RevokedToken, payload["fam"]) is not None:
+            return False
+        # The primary key makes spending atomic; nothing else reads the row
+        db.add(RevokedToken(jti=payload["jti"], expires_at=_expiry(payload), kind=SPENT))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            self.revoke_session(db, payload)
+            return False
+        return True
+
+    def get_revoked_since(
+        self, db: Session, since: Optional[datetime]
+    ) -> List[Tuple[str, datetime, datetime]]:
+        query = db.query(
+            RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at
+        ).filter(RevokedToken.kind == REVOKED)
+        if since is None:
+            query = query.filter(RevokedToken.expires_at > datetime.utcnow())
+        else:
+            query = query.filter(RevokedToken.revoked_at >= since - SYNC_OVERLAP)
+        return [tuple(row) for row in query.all()]
+
+    def load_revoked_since(self, since: Optional[datetime]) -> List[Tuple[str, datetime, datetime]]:
+        """`get_revoked_since` in its own session, for the sync thread."""
+        db = SessionLocal()
+        try:
+            return self.get_revoked_since(db, since)
+        finally:
+            db.close()
+
+    def prune(self, db: Session) -> int:
+        """Delete rows whose tokens have expired anyway."""
+        deleted = (
+            db.query(RevokedToken)
+            .filter(RevokedToken.expires_at <= datetime.utcnow())
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+token = CRUDToken()
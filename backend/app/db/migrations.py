@@ -0,0 +1,430 @@
+# backend/app/db/migrations.py
+"""
+Versioned schema migrations.
+
+Each step runs once, in order, and is recorded in the `schema_version`
+table. Production workers only compare the recorded version with
+SCHEMA_VERSION at startup; DDL runs from this command:
+
+    python -m backend.app.db.migrations
+"""
+
+from datetime import timedelta
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, LargeBinary,
+    MetaData, String, Table, Text, and_, func, inspect, select, text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from .session import engine
+
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_metadata,
+    Column("version", Integer, nullable=False),
+)
+
+# Steps describe the schema as it was when they were written, never through
+# the models: a model that gains a column or an index later must not leak
+# into an earlier step, or that later step would find its work already done.
+
+_baseline_metadata = MetaData()
+
+Table(
+    "users",
+    _baseline_metadata,
+    Column("id", String(36), primary_key=True),
+    Column("email", String(255), unique=True, nullable=False),
+    Column("hashed_password", String(255), nullable=False),
+    Column("full_name", String(255), nullable=True),
+    Column("is_active", Boolean),
+    Column("is_owner", Boolean),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+Table(
+    "items",
+    _baseline_metadata,
+    Column("id", String(36), primary_key=True),
+    Column("owner_id", String(36), ForeignKey("users.id")),
+    Column("name", String(255), nullable=False),
+    Column("description", Text, nullable=True),
+    Column("price_per_day", Float, nullable=False),
+    Column("total_stock", Integer, nullable=False),
+    Column("available_stock", Integer, nullable=False),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+Table(
+    "rentals",
+    _baseline_metadata,
+    Column("id", String(36), primary_key=True),
+    Column("renter_id", String(36), ForeignKey("users.id")),
+    Column("item_id", String(36), ForeignKey("items.id")),
+    Column("start_date", DateTime, nullable=False),
+    Column("end_date", DateTime, nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("total_price", Float, nullable=False),
+    Column("is_active", Boolean),
+    Column("owner_received", Boolean),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+Table(
+    "stock_movements",
+    _baseline_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("item_id", String(36), ForeignKey("items.id"), nullable=False),
+    Column("delta", Integer, nullable=False),
+    Column("reason", String(32), nullable=False),
+    Column("rental_id", String(36), nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_stock_movements_item_id_id", "item_id", "id"),
+    sqlite_autoincrement=True,
+)
+Table(
+    "stock_snapshots",
+    _baseline_metadata,
+    Column("item_id", String(36), ForeignKey("items.id"), primary_key=True),
+    Column("available_stock", Integer, nullable=False),
+    Column("last_movement_id", Integer, nullable=False),
+    Column("compacted_at", DateTime, nullable=False),
+)
+Table(
+    "rentals_archive",
+    _baseline_metadata,
+    Column("id", String(36), primary_key=True),
+    Column("renter_id", String(36), nullable=False),
+    Column("item_id", String(36), nullable=False),
+    Column("start_date", DateTime, nullable=False),
+    Column("end_date", DateTime, nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("total_price", Float, nullable=False),
+    Column("is_active", Boolean, nullable=False),
+    Column("owner_received", Boolean, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=True),
+    Column("archived_at", DateTime, nullable=False),
+    Index("ix_rentals_archive_renter_id_start_date", "renter_id", "start_date"),
+    Index("ix_rentals_archive_item_id_start_date", "item_id", "start_date"),
+)
+Table(
+    "item_rollups",
+    _baseline_metadata,
+    Column("item_id", String(36), ForeignKey("items.id"), primary_key=True),
+    Column("granularity", String(8), primary_key=True),
+    Column("bucket_start", Date, primary_key=True),
+    Column("rentals_count", Integer, nullable=False),
+    Column("revenue", Float, nullable=False),
+    Column("rented_unit_days", Integer, nullable=False),
+    Column("returns_count", Integer, nullable=False),
+    Column("confirmations_count", Integer, nullable=False),
+)
+
+
+def _baseline(conn: Connection) -> None:
+    # Tables that already exist are left untouched
+    _baseline_metadata.create_all(bind=conn)
+
+
+_revoked_tokens_metadata = MetaData()
+revoked_tokens = Table(
+    "revoked_tokens",
+    _revoked_tokens_metadata,
+    Column("jti", String(36), primary_key=True),
+    Column("expires_at", DateTime, nullable=False),
+    Column("revoked_at", DateTime, nullable=False),
+    Index("ix_revoked_tokens_revoked_at", "revoked_at"),
+)
+
+
+def _revoked_tokens(conn: Connection) -> None:
+    revoked_tokens.create(bind=conn, checkfirst=True)
+
+
+# (table, index name, columns, optional WHERE built from the table's columns)
+IndexSpec = Tuple[str, str, Sequence[str], Optional[Callable]]
+
+
+def _create_indexes(conn: Connection, specs: Sequence[IndexSpec]) -> None:
+    # Indexes are built on the table as it exists in the database, so they
+    # never attach to the models' tables. Partial indexes fall back to plain
+    # composite indexes on MySQL, which ignores the WHERE clause.
+    tables = {}
+    for table_name, name, columns, where in specs:
+        if table_name not in tables:
+            tables[table_name] = Table(table_name, MetaData(), autoload_with=conn)
+        table = tables[table_name]
+        kwargs = {}
+        if where is not None:
+            kwargs = {"sqlite_where": where(table.c), "postgresql_where": where(table.c)}
+        Index(name, *(table.c[column] for column in columns), **kwargs).create(
+            bind=conn, checkfirst=True
+        )
+
+
+HOT_PATH_INDEXES: List[IndexSpec] = [
+    # Availability: overlapping active rentals of an item
+    ("rentals", "ix_rentals_active_item_dates", ["item_id", "start_date", "end_date"],
+     lambda c: c.is_active == True),  # noqa: E712
+    # A renter's active rentals
+    ("rentals", "ix_rentals_renter_active", ["renter_id", "is_active"], None),
+    # Archival: ended rentals by end date
+    ("rentals", "ix_rentals_ended_end_date", ["end_date"],
+     lambda c: c.is_active == False),  # noqa: E712
+    # An owner's items
+    ("items", "ix_items_owner_id", ["owner_id"], None),
+    # users.email is already covered by its unique constraint
+]
+
+
+def _hot_path_indexes(conn: Connection) -> None:
+    _create_indexes(conn, HOT_PATH_INDEXES)
+
+
+# Rental history pages: seek by (key, start_date, id), with the filter
+# columns in the index so non-matching rows are skipped without a table read.
+# Not covering: returned rows are still read from the table. Replaced by
+# COVERING_HISTORY_INDEXES.
+HISTORY_INDEXES: List[IndexSpec] = [
+    (table, f"ix_{table}_renter_history",
+     ["renter_id", "start_date", "id", "is_active", "owner_received", "item_id", "end_date"],
+     None)
+    for table in ("rentals", "rentals_archive")
+] + [
+    (table, f"ix_{table}_item_history",
+     ["item_id", "start_date", "id", "is_active", "owner_received", "end_date"],
+     None)
+    for table in ("rentals", "rentals_archive")
+]
+
+
+def _drop_index(conn: Connection, table: str, name: str) -> None:
+    if name not in {index["name"] for index in inspect(conn).get_indexes(table)}:
+        return
+    if conn.dialect.name in ("mysql", "mariadb"):
+        conn.execute(text(f"DROP INDEX {name} ON {table}"))
+    else:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+
+def _history_indexes(conn: Connection) -> None:
+    # Superseded by the archive's history indexes
+    _drop_index(conn, "rentals_archive", "ix_rentals_archive_renter_id_start_date")
+    _drop_index(conn, "rentals_archive", "ix_rentals_archive_item_id_start_date")
+    _create_indexes(conn, HISTORY_INDEXES)
+
+
+# Archival: confirmed rentals by the time they were last changed
+ARCHIVAL_INDEXES: List[IndexSpec] = [
+    ("rentals", "ix_rentals_confirmed_updated_at", ["updated_at"],
+     lambda c: and_(c.is_active == False, c.owner_received == True)),  # noqa: E712
+]
+
+
+def _archival_index(conn: Connection) -> None:
+    # Archival no longer filters on the planned end date
+    _drop_index(conn, "rentals", "ix_rentals_ended_end_date")
+    _create_indexes(conn, ARCHIVAL_INDEXES)
+
+
+_idempotency_keys_metadata = MetaData()
+idempotency_keys = Table(
+    "idempotency_keys",
+    _idempotency_keys_metadata,
+    Column("principal", String(36), primary_key=True),
+    Column("key", String(255), primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("status", Integer, nullable=True),
+    Column("headers", Text, nullable=True),
+    Column("body", LargeBinary, nullable=True),
+    Column("expires_at", DateTime, nullable=False),
+    Index("ix_idempotency_keys_expires_at", "expires_at"),
+)
+
+
+def _idempotency_keys(conn: Connection) -> None:
+    idempotency_keys.create(bind=conn, checkfirst=True)
+
+
+def _rollup_unit_deltas(conn: Connection) -> None:
+    # Rented unit-days per day become deltas: +units on the first day of each
+    # run of rented days, -units on the day after; week rows get no deltas
+    conn.execute(text(
+        "ALTER TABLE item_rollups ADD COLUMN unit_delta INTEGER NOT NULL DEFAULT 0"
+    ))
+    rollups = Table("item_rollups", MetaData(), autoload_with=conn)
+    rows = conn.execute(
+        select(rollups.c.item_id, rollups.c.bucket_start, rollups.c.rented_unit_days)
+        .where(rollups.c.granularity == "day", rollups.c.rented_unit_days != 0)
+        .order_by(rollups.c.item_id, rollups.c.bucket_start)
+    )
+    deltas = {}
+    previous = None  # (item_id, day, units)
+    for item_id, day, units in rows:
+        before = 0
+        if previous is not None:
+            if previous[0] == item_id and previous[1] + timedelta(days=1) == day:
+                before = previous[2]
+            else:
+                key = (previous[0], previous[1] + timedelta(days=1))
+                deltas[key] = deltas.get(key, 0) - previous[2]
+        if units != before:
+            deltas[(item_id, day)] = deltas.get((item_id, day), 0) + units - before
+        previous = (item_id, day, units)
+    if previous is not None:
+        key = (previous[0], previous[1] + timedelta(days=1))
+        deltas[key] = deltas.get(key, 0) - previous[2]
+
+    for (item_id, day), delta in deltas.items():
+        where = and_(rollups.c.item_id == item_id, rollups.c.granularity == "day",
+                     rollups.c.bucket_start == day)
+        if not conn.execute(rollups.update().where(where).values(unit_delta=delta)).rowcount:
+            conn.execute(rollups.insert().values(
+                item_id=item_id, granularity="day", bucket_start=day, rentals_count=0,
+                revenue=0.0, rented_unit_days=0, returns_count=0, confirmations_count=0,
+                unit_delta=delta,
+            ))
+    conn.execute(text("ALTER TABLE item_rollups DROP COLUMN rented_unit_days"))
+
+
+def _revoked_token_kinds(conn: Connection) -> None:
+    # Rows written before this are all treated as revocations; spent refresh
+    # tokens among them are pruned once they expire
+    conn.execute(text(
+        "ALTER TABLE revoked_tokens ADD COLUMN kind VARCHAR(16) NOT NULL DEFAULT 'revoked'"
+    ))
+    _drop_index(conn, "revoked_tokens", "ix_revoked_tokens_revoked_at")
+    _create_indexes(conn, REVOKED_TOKEN_INDEXES)
+
+
+# Revocation sync: rows of the mirrored kind newer than the last sync
+REVOKED_TOKEN_INDEXES: List[IndexSpec] = [
+    ("revoked_tokens", "ix_revoked_tokens_kind_revoked_at", ["kind", "revoked_at"], None),
+]
+
+
+_shared_state_metadata = MetaData()
+# Referenced by the holds' foreign keys; they already exist and are not created here
+for _name in ("users", "items"):
+    Table(_name, _shared_state_metadata, Column("id", String(36), primary_key=True))
+Table(
+    "stock_holds",
+    _shared_state_metadata,
+    Column("id", String(36), primary_key=True),
+    Column("item_id", String(36), ForeignKey("items.id"), nullable=False),
+    Column("renter_id", String(36), ForeignKey("users.id"), nullable=False),
+    Column("start_date", DateTime, nullable=False),
+    Column("end_date", DateTime, nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+    Index("ix_stock_holds_item_id_expires_at",
+          "item_id", "expires_at", "start_date", "end_date", "quantity"),
+    Index("ix_stock_holds_expires_at", "expires_at"),
+)
+Table(
+    "availability_events",
+    _shared_state_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("item_id", String(36), nullable=False),
+    Column("reason", String(32), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_availability_events_created_at", "created_at"),
+)
+
+
+def _shared_state(conn: Connection) -> None:
+    # State every worker must see: checkout holds and availability events
+    for name in ("stock_holds", "availability_events"):
+        _shared_state_metadata.tables[name].create(bind=conn, checkfirst=True)
+
+
+# Rental history pages, covering: the seek key, then every other column a
+# history page selects, so pages are served from the index alone. Owners seek
+# by the owner id copied onto each rental instead of one seek per item.
+_HISTORY_PAGE_COLUMNS = [
+    "id", "is_active", "owner_received", "item_id", "end_date", "quantity",
+    "total_price", "created_at", "updated_at",
+]
+COVERING_HISTORY_INDEXES: List[IndexSpec] = [
+    (table, f"ix_{table}_renter_history_covering",
+     ["renter_id", "start_date", *_HISTORY_PAGE_COLUMNS], None)
+    for table in ("rentals", "rentals_archive")
+] + [
+    (table, f"ix_{table}_owner_history_covering",
+     ["owner_id", "start_date", *_HISTORY_PAGE_COLUMNS, "renter_id"], None)
+    for table in ("rentals", "rentals_archive")
+]
+
+
+def _rental_owners(conn: Connection) -> None:
+    conn.execute(text("ALTER TABLE rentals ADD COLUMN owner_id VARCHAR(36) REFERENCES users(id)"))
+    conn.execute(text("ALTER TABLE rentals_archive ADD COLUMN owner_id VARCHAR(36)"))
+    items = Table("items", MetaData(), autoload_with=conn)
+    for name in ("rentals", "rentals_archive"):
+        rentals = Table(name, MetaData(), autoload_with=conn)
+        conn.execute(rentals.update().values(
+            owner_id=select(items.c.owner_id)
+            .where(items.c.id == rentals.c.item_id)
+            .scalar_subquery()
+        ))
+        _drop_index(conn, name, f"ix_{name}_renter_history")
+        _drop_index(conn, name, f"ix_{name}_item_history")
+    _create_indexes(conn, COVERING_HISTORY_INDEXES)
+
+
+MIGRATIONS: List[Tuple[int, Callable[[Connection], None]]] = [
+    (1, _baseline),
+    (2, _revoked_tokens),
+    (3, _hot_path_indexes),
+    (4, _history_indexes),
+    (5, _archival_index),
+    (6, _idempotency_keys),
+    (7, _rollup_unit_deltas),
+    (8, _revoked_token_kinds),
+    (9, _shared_state),
+    (10, _rental_owners),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised at startup when the database is not at SCHEMA_VERSION."""
+
+
+def get_schema_version(conn: Connection) -> Optional[int]:
+    if not inspect(conn).has_table(schema_version.name):
+        return None
+    return conn.execute(select(func.max(schema_version.c.version))).scalar()
+
+
+def migrate(bind: Engine = engine) -> int:
+    """Apply pending migrations and return the resulting version."""
+    with bind.begin() as conn:
+        _version_metadata.create_all(bind=conn)
+        current = get_schema_version(conn) or 0
+        for version, step in MIGRATIONS:
+            if version > current:
+                step(conn)
+                conn.execute(schema_version.insert().values(version=version))
+                current = version
+    return current
+
+
+def check_schema_version(bind: Engine = engine) -> None:
+    with bind.connect() as conn:
+        current = get_schema_version(conn)
+    if current != SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"Database schema is at version {current}, expected {SCHEMA_VERSION}. "
+            "Run `python -m backend.app.db.migrations` (or set ENV=development "
+            "to migrate automatically on startup)."
+        )
+
+
+if __name__ == "__main__":
+    print(f"schema at version {migrate()}")
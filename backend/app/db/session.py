@@ -4,10 +4,13 @@ Database session and engine setup.
 Supports both SQLite and MySQL.
 """
 
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, DeclarativeBase 
 from sqlalchemy.orm import sessionmaker
 from ..core.config import settings
+from ..core.load_shedding import DeadlineExceeded, request_deadline
 
 # SQLAlchemy engine
 engine = create_engine(
@@ -16,6 +19,69 @@ engine = create_engine(
     pool_pre_ping=True,
 )
 
+
+# --- Per-request deadlines ---
+# Fail fast once the request deadline has passed, and bound each transaction
+# by the time left using the dialect's own statement timeout.
+@event.listens_for(engine, "before_cursor_execute")
+def _check_deadline(conn, cursor, statement, parameters, context, executemany):
+    deadline = request_deadline.get()
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded()
+
+
+@event.listens_for(engine, "begin")
+def _apply_statement_timeout(conn):
+    deadline = request_deadline.get()
+    if deadline is None:
+        return
+    remaining_ms = max(1, int((deadline - time.monotonic()) * 1000))
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        conn.connection.driver_connection.set_progress_handler(
+            lambda: time.monotonic() >= deadline, 10_000
+        )
+        return
+    if dialect == "postgresql":
+        statement = f"SET LOCAL statement_timeout = {remaining_ms}"
+    elif dialect in ("mysql", "mariadb"):
+        statement = f"SET SESSION max_execution_time = {remaining_ms}"
+    else:
+        return
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+@event.listens_for(engine, "checkin")
+def _clear_statement_timeout(dbapi_connection, connection_record):
+    # Connections go back to the pool without the previous request's timeout
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        dbapi_connection.set_progress_handler(None, 0)
+    elif dialect in ("mysql", "mariadb"):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SET SESSION max_execution_time = 0")
+        finally:
+            cursor.close()
+
+
+def warm_pool(connections: int) -> None:
+    """Open pooled connections up front so early requests skip connect latency."""
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            conn.exec_driver_sql("SELECT 1")
+            opened.append(conn)
+    finally:
+        for conn in opened:
+            conn.close()
+
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,5 @@
+# backend/app/jobs/__init__.py
+"""
+Package initializer for maintenance jobs.
+Each module is runnable with `python -m backend.app.jobs.<name>`.
+"""
@@ -0,0 +1,47 @@
+# backend/app/jobs/archive_rentals.py
+"""
+Move ended rentals out of the hot rentals table.
+
+    python -m backend.app.jobs.archive_rentals [--retention-days N] [--every SECONDS]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from ..core.config import settings
+from ..crud.rental import rental as crud_rental
+from ..db.session import SessionLocal
+
+
+def run_archival(retention_days: int) -> None:
+    db = SessionLocal()
+    try:
+        archived = crud_rental.archive_ended(
+            db,
+            older_than=datetime.utcnow() - timedelta(days=retention_days),
+            batch_size=settings.RENTAL_ARCHIVE_BATCH_SIZE,
+        )
+        print(f"archived {archived} rental(s)")
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Archive ended rentals")
+    parser.add_argument("--retention-days", type=int,
+                        default=settings.RENTAL_ARCHIVE_RETENTION_DAYS,
+                        help="keep rentals that ended within this many days")
+    parser.add_argument("--every", type=int, default=0,
+                        help="repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    while True:
+        run_archival(args.retention_days)
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
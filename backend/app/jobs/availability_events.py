@@ -0,0 +1,40 @@
+# backend/app/jobs/availability_events.py
+"""
+Delete availability events older than EVENTS_RETENTION_SECONDS
+(EVENTS_BACKEND=database). Workers only poll recent events.
+
+    python -m backend.app.jobs.availability_events [--every SECONDS]
+"""
+
+import argparse
+import time
+
+from ..core.config import settings
+from ..crud.availability_event import availability_event as crud_event
+from ..db.session import SessionLocal
+
+
+def run_prune() -> None:
+    db = SessionLocal()
+    try:
+        deleted = crud_event.prune(db, settings.EVENTS_RETENTION_SECONDS)
+        print(f"pruned {deleted} availability event(s)")
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Prune old availability events")
+    parser.add_argument("--every", type=int, default=0,
+                        help="repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    while True:
+        run_prune()
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
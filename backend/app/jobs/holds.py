@@ -0,0 +1,38 @@
+# backend/app/jobs/holds.py
+"""
+Delete expired checkout holds (HOLDS_BACKEND=database). Reads already skip
+them; this only keeps the table small.
+
+    python -m backend.app.jobs.holds [--every SECONDS]
+"""
+
+import argparse
+import time
+
+from ..crud.hold import DatabaseHoldStore
+from ..db.session import SessionLocal
+
+
+def run_prune() -> None:
+    db = SessionLocal()
+    try:
+        print(f"pruned {DatabaseHoldStore().prune(db)} expired hold(s)")
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Prune expired checkout holds")
+    parser.add_argument("--every", type=int, default=0,
+                        help="repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    while True:
+        run_prune()
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
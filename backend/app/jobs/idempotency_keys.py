@@ -0,0 +1,38 @@
+# backend/app/jobs/idempotency_keys.py
+"""
+Delete expired idempotency keys and claims abandoned by crashed workers
+(IDEMPOTENCY_BACKEND=database).
+
+    python -m backend.app.jobs.idempotency_keys [--every SECONDS]
+"""
+
+import argparse
+import time
+
+from ..crud.idempotency import idempotency as crud_idempotency
+from ..db.session import SessionLocal
+
+
+def run_prune() -> None:
+    db = SessionLocal()
+    try:
+        print(f"pruned {crud_idempotency.prune(db)} idempotency key(s)")
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Prune expired idempotency keys")
+    parser.add_argument("--every", type=int, default=0,
+                        help="repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    while True:
+        run_prune()
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,33 @@
+# backend/app/jobs/profiler.py
+"""
+Mint an operator token for per-request profiling.
+
+    python -m backend.app.jobs.profiler token [--ttl-minutes N]
+
+Send it as `X-Profile-Token` on a request to profile it (the response's
+`X-Profile-Id` names the result), and on /api/v1/profiles to download results.
+"""
+
+import argparse
+from datetime import timedelta
+
+from ..core.config import settings
+from ..core.security import create_profiling_token
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-request profiling tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    token_parser = commands.add_parser("token", help="print a profiling token")
+    token_parser.add_argument("--ttl-minutes", type=int,
+                              default=settings.PROFILER_TOKEN_TTL_MINUTES)
+    args = parser.parse_args()
+
+    if not settings.PROFILER_ENABLED:
+        print("note: PROFILER_ENABLED is off; the API will ignore this token")
+    print(create_profiling_token(timedelta(minutes=args.ttl_minutes)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
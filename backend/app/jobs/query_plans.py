@@ -0,0 +1,224 @@
+# backend/app/jobs/query_plans.py
+"""
+Query-plan regression check for hot-path queries.
+
+Seeds a throwaway SQLite database through the migrations, runs the real CRUD
+calls against it and fails if EXPLAIN QUERY PLAN shows any of them scanning
+a table that an index should cover, or reading rows of a table that a
+covering index should answer alone. backend/tests/test_query_plans.py runs
+the same checks.
+
+    python -m backend.app.jobs.query_plans [--rentals N] [--verbose]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session
+
+from .. import crud
+from ..db.migrations import migrate
+from ..models.item import Item
+from ..models.rental import Rental
+from ..models.user import User
+
+SEED_START = datetime(2025, 1, 1)
+
+
+class Check:
+    def __init__(self, name: str, run: Callable[[Session, dict], object],
+                 no_scan: Sequence[str], covering: Sequence[str] = ()):
+        self.name = name
+        self.run = run
+        # Tables this call must reach through an index
+        self.no_scan = no_scan
+        # Tables this call must read through a covering index only
+        self.covering = covering
+
+
+CHECKS = [
+    Check(
+        "item availability",
+        lambda db, ids: crud.rental.get_rented_quantity(
+            db, ids["item"], SEED_START + timedelta(days=100), SEED_START + timedelta(days=103)
+        ),
+        ["rentals"],
+    ),
+    Check(
+        "catalog availability",
+        lambda db, ids: crud.item.get_items_with_availability(
+            db, SEED_START + timedelta(days=100), SEED_START + timedelta(days=103), limit=20
+        ),
+        ["rentals", "stock_holds"],
+    ),
+    Check(
+        "active rentals",
+        lambda db, ids: crud.rental.get_active_rentals(db, renter_id=ids["renter"]),
+        ["rentals"],
+    ),
+    Check(
+        "user by email",
+        lambda db, ids: crud.user.get_by_email(db, email=ids["email"]),
+        ["users"],
+    ),
+    Check(
+        "owner items",
+        lambda db, ids: crud.item.get_by_owner(db, owner_id=ids["owner"]),
+        ["items"],
+    ),
+    Check(
+        "renter history page",
+        lambda db, ids: crud.rental.get_history(
+            db, renter_id=ids["renter"], status="ended", limit=20
+        ),
+        ["rentals", "rentals_archive"],
+        covering=["rentals", "rentals_archive"],
+    ),
+    Check(
+        "owner history page",
+        lambda db, ids: crud.rental.get_owner_history(db, owner_id=ids["owner"], limit=20),
+        ["rentals", "rentals_archive"],
+        covering=["rentals", "rentals_archive"],
+    ),
+    # Last: it moves rows into the archive
+    Check(
+        "archival batch",
+        lambda db, ids: crud.rental.archive_ended(db, older_than=SEED_START, batch_size=100),
+        ["rentals"],
+    ),
+]
+
+
+def seed(db: Session, rentals: int) -> dict:
+    rng = random.Random(42)
+    users = [
+        {"id": str(uuid.uuid4()), "email": f"user{i}@example.com", "hashed_password": "x",
+         "is_active": True, "is_owner": i % 10 == 0}
+        for i in range(max(50, rentals // 20))
+    ]
+    owners = [user["id"] for user in users if user["is_owner"]]
+    items = [
+        {"id": str(uuid.uuid4()), "owner_id": rng.choice(owners), "name": f"item {i}",
+         "price_per_day": 10.0, "total_stock": 5, "available_stock": 5, "is_active": True}
+        for i in range(max(50, rentals // 10))
+    ]
+    rows = []
+    for _ in range(rentals):
+        start = SEED_START + timedelta(days=rng.randrange(365))
+        item = rng.choice(items)
+        rows.append({
+            "id": str(uuid.uuid4()), "renter_id": rng.choice(users)["id"],
+            "item_id": item["id"], "owner_id": item["owner_id"], "start_date": start,
+            "end_date": start + timedelta(days=rng.randrange(1, 8)), "quantity": 1,
+            "total_price": 10.0, "is_active": rng.random() < 0.1, "owner_received": False,
+        })
+    db.execute(insert(User), users)
+    db.execute(insert(Item), items)
+    db.execute(insert(Rental), rows)
+    db.commit()
+    db.connection().exec_driver_sql("ANALYZE")
+    return {
+        "item": rows[0]["item_id"],
+        "renter": rows[0]["renter_id"],
+        "email": users[1]["email"],
+        "owner": owners[0],
+    }
+
+
+def explain(db: Session, check: Check, ids: dict) -> List[Tuple[str, List[str]]]:
+    """Run the check's call and return (statement, plan lines) for each query."""
+    captured: List[Tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        check.run(db, ids)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = []
+    for statement, parameters in captured:
+        rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.append((statement, [row[-1] for row in rows]))
+    return plans
+
+
+def full_scans(plan: List[str], tables: Sequence[str]) -> List[str]:
+    # "SCAN t" is a full scan; "SCAN t USING [COVERING] INDEX" walks an index.
+    # An AUTOMATIC index is built from a full scan on every execution.
+    scans = []
+    for line in plan:
+        words = line.split()
+        if len(words) < 2 or words[0] not in ("SCAN", "SEARCH") or words[1] not in tables:
+            continue
+        if (words[0] == "SCAN" and "USING" not in words) or "AUTOMATIC" in words:
+            scans.append(line)
+    return scans
+
+
+def table_reads(plan: List[str], tables: Sequence[str]) -> List[str]:
+    # Steps that read table rows: anything but a walk of a covering index
+    reads = []
+    for line in plan:
+        words = line.split()
+        if len(words) < 2 or words[0] not in ("SCAN", "SEARCH") or words[1] not in tables:
+            continue
+        if "COVERING" not in words:
+            reads.append(line)
+    return reads
+
+
+@contextmanager
+def seeded_database(rentals: int) -> Iterator[Tuple[Session, dict]]:
+    """A migrated, seeded temporary database; yields a session and the seed ids."""
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        migrate(engine)
+        with Session(engine) as db:
+            yield db, seed(db, rentals)
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check hot-path query plans")
+    parser.add_argument("--rentals", type=int, default=5000, help="rentals to seed")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    failures = 0
+    with seeded_database(args.rentals) as (db, ids):
+        for check in CHECKS:
+            scans = []
+            for statement, plan in explain(db, check, ids):
+                scans += full_scans(plan, check.no_scan) + table_reads(plan, check.covering)
+                if args.verbose:
+                    print(f"-- {check.name}\n{statement}\n  " + "\n  ".join(plan))
+            print(f"{'FAIL' if scans else 'ok  '} {check.name}"
+                  + (f": {'; '.join(scans)}" if scans else ""))
+            failures += bool(scans)
+
+    if failures:
+        print(f"{failures} hot-path quer{'y' if failures == 1 else 'ies'} regressed "
+              "to a full table scan or a table read", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
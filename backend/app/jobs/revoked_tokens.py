@@ -0,0 +1,37 @@
+# backend/app/jobs/revoked_tokens.py
+"""
+Delete denylist rows for tokens that have expired anyway.
+
+    python -m backend.app.jobs.revoked_tokens [--every SECONDS]
+"""
+
+import argparse
+import time
+
+from ..crud.token import token as crud_token
+from ..db.session import SessionLocal
+
+
+def run_prune() -> None:
+    db = SessionLocal()
+    try:
+        print(f"pruned {crud_token.prune(db)} revoked token(s)")
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Prune expired revoked tokens")
+    parser.add_argument("--every", type=int, default=0,
+                        help="repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    while True:
+        run_prune()
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
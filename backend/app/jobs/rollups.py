@@ -0,0 +1,23 @@
+# backend/app/jobs/rollups.py
+"""
+Rebuild owner dashboard rollups from rental history.
+
+    python -m backend.app.jobs.rollups
+"""
+
+from ..crud.rollup import rollup as crud_rollup
+from ..db.session import SessionLocal
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        written = crud_rollup.backfill(db)
+    finally:
+        db.close()
+    print(f"wrote {written} rollup row(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
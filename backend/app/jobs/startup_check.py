@@ -0,0 +1,65 @@
+# backend/app/jobs/startup_check.py
+"""
+Cold-start budget check for the API.
+
+Imports the app and runs its lifespan startup in a fresh interpreter,
+then fails if either phase exceeds its budget.
+
+    python -m backend.app.jobs.startup_check [--import-budget S] [--startup-budget S]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict, Optional
+
+# Runs in a clean interpreter so nothing is already imported or warmed
+_PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from backend.main import app
+imported = time.perf_counter()
+
+async def startup():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(startup())
+print(json.dumps({"import": imported - started, "startup": ready - imported}))
+"""
+
+
+def measure(env: Optional[Dict[str, str]] = None) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE], capture_output=True, text=True, env=env
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"startup failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check API import and startup time")
+    parser.add_argument("--import-budget", type=float, default=2.0,
+                        help="maximum seconds to import backend.main")
+    parser.add_argument("--startup-budget", type=float, default=3.0,
+                        help="maximum seconds for lifespan startup")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="take the best of N cold starts")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    import_time = min(run["import"] for run in runs)
+    startup_time = min(run["startup"] for run in runs)
+    print(f"import {import_time:.3f}s (budget {args.import_budget}s), "
+          f"startup {startup_time:.3f}s (budget {args.startup_budget}s)")
+
+    if import_time > args.import_budget or startup_time > args.startup_budget:
+        print("cold start is over budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+# backend/app/jobs/stock_ledger.py
+"""
+Stock ledger maintenance.
+
+    python -m backend.app.jobs.stock_ledger compact [--every SECONDS] [--prune]
+    python -m backend.app.jobs.stock_ledger reconcile [--apply]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from ..core.config import settings
+from ..crud.stock import stock as crud_stock
+from ..db.session import SessionLocal
+
+
+def run_compaction(prune: bool = False) -> None:
+    db = SessionLocal()
+    try:
+        folded = crud_stock.compact(db)
+        print(f"compacted {folded} item(s)")
+        if prune:
+            cutoff = datetime.utcnow() - timedelta(days=settings.STOCK_LEDGER_RETENTION_DAYS)
+            print(f"pruned {crud_stock.prune(db, older_than=cutoff)} movement(s)")
+    finally:
+        db.close()
+
+
+def run_reconcile(apply: bool = False) -> int:
+    db = SessionLocal()
+    try:
+        drift = crud_stock.reconcile(db, apply=apply)
+    finally:
+        db.close()
+    for row in drift:
+        print(f"{row['item_id']}: ledger={row['ledger']} expected={row['expected']}")
+    verb = "corrected" if apply else "found"
+    print(f"{verb} drift on {len(drift)} item(s)")
+    return 1 if drift and not apply else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Stock ledger maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    compact = sub.add_parser("compact", help="fold settled movements into snapshots")
+    compact.add_argument("--every", type=int, default=0,
+                         help="repeat every N seconds instead of running once")
+    compact.add_argument("--prune", action="store_true",
+                         help="delete folded movements older than the retention window")
+
+    reconcile = sub.add_parser("reconcile", help="compare the ledger with active rentals")
+    reconcile.add_argument("--apply", action="store_true",
+                           help="append correcting movements for drifting items")
+
+    args = parser.parse_args()
+    if args.command == "reconcile":
+        return run_reconcile(apply=args.apply)
+
+    while True:
+        run_compaction(prune=args.prune)
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
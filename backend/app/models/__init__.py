@@ -0,0 +1,9 @@
+# backend/app/models/__init__.py
+"""
+Package initializer for SQLAlchemy models.
+Provides unified access to the core entities.
+"""
+
+from .user import User
+from .item import Item
+from .rental import Rental
@@ -0,0 +1,27 @@
+# backend/app/models/availability_event.py
+"""
+Availability events shared by every worker (EVENTS_BACKEND=database).
+
+Each worker polls for rows created since its last poll and fans them out to
+its own stream subscribers. Old rows are pruned by the events job.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from ..db.session import Base
+
+
+class AvailabilityEvent(Base):
+    __tablename__ = "availability_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    item_id = Column(String(36), nullable=False)
+    reason = Column(String(32), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Polling for new events and pruning old ones
+        Index("ix_availability_events_created_at", "created_at"),
+    )
@@ -0,0 +1,29 @@
+# backend/app/models/idempotency_key.py
+"""
+Idempotency keys shared by every worker.
+
+A row with a NULL status is a claim held by the worker serving the first
+request; once it finishes, the row holds the response to replay.
+"""
+
+from sqlalchemy import Column, DateTime, Index, Integer, LargeBinary, String, Text
+
+from ..db.session import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    principal = Column(String(36), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status = Column(Integer, nullable=True)
+    headers = Column(Text, nullable=True)  # JSON list of [name, value] pairs
+    body = Column(LargeBinary, nullable=True)
+    # Claims expire after a lease, stored responses after the TTL
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Pruning of expired keys
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
@@ -0,0 +1,32 @@
+# backend/app/models/item.py
+"""
+SQLAlchemy model for Item entity.
+
+`total_stock` is what the owner listed; `available_stock` is what is not out
+on an active rental right now.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from ..db.session import Base
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    owner_id = Column(String(36), ForeignKey("users.id"))
+    name = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    price_per_day = Column(Float, nullable=False)
+    total_stock = Column(Integer, nullable=False)
+    available_stock = Column(Integer, nullable=False)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
+
+    owner = relationship("User")
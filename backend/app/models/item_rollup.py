@@ -0,0 +1,26 @@
+# backend/app/models/item_rollup.py
+"""
+Per-item rental rollups by day and by week.
+
+Rows are incremented as rentals are created, ended, and confirmed so that
+owner dashboards never scan rental history.
+"""
+
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer, String
+
+from ..db.session import Base
+
+
+class ItemRollup(Base):
+    __tablename__ = "item_rollups"
+
+    item_id = Column(String(36), ForeignKey("items.id"), primary_key=True)
+    granularity = Column(String(8), primary_key=True)  # "day" or "week"
+    bucket_start = Column(Date, primary_key=True)
+    rentals_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    # Day buckets only: change in units out on this day (+ on a rental's
+    # first day, - on the day after its last); dashboards sum these
+    unit_delta = Column(Integer, nullable=False, default=0)
+    returns_count = Column(Integer, nullable=False, default=0)
+    confirmations_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,35 @@
+# backend/app/models/rental.py
+"""
+SQLAlchemy model for Rental entity.
+
+A rental books `quantity` units of an item for [start_date, end_date]. It is
+active until the renter ends it and settled once the owner confirms receipt.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+
+from ..db.session import Base
+
+
+class Rental(Base):
+    __tablename__ = "rentals"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    renter_id = Column(String(36), ForeignKey("users.id"))
+    item_id = Column(String(36), ForeignKey("items.id"))
+    # The item's owner, copied at booking so owner history seeks its own index
+    owner_id = Column(String(36), ForeignKey("users.id"))
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    total_price = Column(Float, nullable=False)
+    is_active = Column(Boolean, default=True)
+    owner_received = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
+
+    item = relationship("Item")
@@ -0,0 +1,33 @@
+# backend/app/models/rental_archive.py
+"""
+Archive of ended rentals.
+
+Mirrors the rentals table so that the archival job can move rows with a
+set-based INSERT ... SELECT and keep the hot table limited to live bookings.
+Its history indexes are created by the migrations, like those on rentals.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String
+
+from ..db.session import Base
+
+
+class ArchivedRental(Base):
+    __tablename__ = "rentals_archive"
+
+    id = Column(String(36), primary_key=True)
+    renter_id = Column(String(36), nullable=False)
+    item_id = Column(String(36), nullable=False)
+    owner_id = Column(String(36), nullable=True)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    total_price = Column(Float, nullable=False)
+    is_active = Column(Boolean, nullable=False, default=False)
+    owner_received = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
@@ -0,0 +1,30 @@
+# backend/app/models/revoked_token.py
+"""
+Denylist of revoked token ids.
+
+A row's `jti` is either a single token's id or a login session's family id,
+which revokes every token issued in that session. Spent refresh tokens are
+recorded as well, but only the database needs them, to detect reuse; workers
+mirror the other kinds in memory.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, String
+
+from ..db.session import Base
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(36), primary_key=True)
+    kind = Column(String(16), nullable=False, default="revoked")  # "revoked" or "spent"
+    # Once past this, the token would be rejected anyway and the row can go
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Workers sync revocations newer than their last sync
+        Index("ix_revoked_tokens_kind_revoked_at", "kind", "revoked_at"),
+    )
@@ -0,0 +1,34 @@
+# backend/app/models/stock_hold.py
+"""
+Checkout holds shared by every worker (HOLDS_BACKEND=database).
+
+A row reserves stock until `expires_at`. Reads ignore expired rows, and the
+holds job deletes them.
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from ..db.session import Base
+
+
+class StockHold(Base):
+    __tablename__ = "stock_holds"
+
+    id = Column(String(36), primary_key=True)
+    item_id = Column(String(36), ForeignKey("items.id"), nullable=False)
+    renter_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Held quantity per item: live holds, with the overlap columns and
+        # quantity in the index so the sum never reads the table
+        Index(
+            "ix_stock_holds_item_id_expires_at",
+            "item_id", "expires_at", "start_date", "end_date", "quantity",
+        ),
+        # Pruning of expired holds
+        Index("ix_stock_holds_expires_at", "expires_at"),
+    )
@@ -0,0 +1,42 @@
+# backend/app/models/stock_ledger.py
+"""
+Append-only stock ledger.
+
+Every stock change is inserted as a StockMovement; the compaction job folds
+movements into one StockSnapshot row per item.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from ..db.session import Base
+
+
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    item_id = Column(String(36), ForeignKey("items.id"), nullable=False)
+    delta = Column(Integer, nullable=False)
+    reason = Column(String(32), nullable=False)
+    rental_id = Column(String(36), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Tail reads: movements of an item after its snapshot watermark
+        Index("ix_stock_movements_item_id_id", "item_id", "id"),
+        # Ids must never be reused after pruning, or new movements would fall
+        # below a snapshot watermark
+        {"sqlite_autoincrement": True},
+    )
+
+
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+
+    item_id = Column(String(36), ForeignKey("items.id"), primary_key=True)
+    available_stock = Column(Integer, nullable=False, default=0)
+    # Highest StockMovement.id already folded into available_stock
+    last_movement_id = Column(Integer, nullable=False, default=0)
+    compacted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
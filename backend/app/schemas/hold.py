@@ -0,0 +1,29 @@
+# backend/app/schemas/hold.py
+"""
+Pydantic schemas for checkout reservation holds.
+Used for request validation and response serialization.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+from .rental import RentalCreate
+
+
+# --- Create ---
+class HoldCreate(RentalCreate):
+    ttl_seconds: Optional[int] = Field(default=None, gt=0)
+
+
+# --- Response model ---
+class HoldResponse(BaseModel):
+    id: str
+    item_id: str
+    start_date: datetime
+    end_date: datetime
+    quantity: int
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
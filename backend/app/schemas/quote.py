@@ -0,0 +1,45 @@
+# backend/app/schemas/quote.py
+"""
+Pydantic schemas for batch price quotes.
+Used for request validation and response serialization.
+"""
+
+from pydantic import BaseModel, field_validator
+from typing import List, Optional
+from datetime import datetime, timezone
+
+
+# --- Request ---
+class QuoteLine(BaseModel):
+    item_id: str
+    start_date: datetime
+    end_date: datetime
+    quantity: int
+
+    @field_validator("start_date", "end_date")
+    @classmethod
+    def _to_naive_utc(cls, v: datetime) -> datetime:
+        """Rental dates are stored as naive UTC; compare quotes the same way."""
+        if v.tzinfo is not None:
+            return v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
+
+
+class QuoteRequest(BaseModel):
+    lines: List[QuoteLine]
+    include_availability: bool = False
+
+
+# --- Response ---
+class QuoteLineResponse(QuoteLine):
+    days: int
+    price_per_day: Optional[float] = None
+    total_price: Optional[float] = None
+    available_stock: Optional[int] = None
+    is_available: Optional[bool] = None
+    error: Optional[str] = None
+
+
+class QuoteResponse(BaseModel):
+    lines: List[QuoteLineResponse]
+    total_price: float
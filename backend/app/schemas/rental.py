@@ -5,7 +5,7 @@ Used for request validation and response serialization.
 """
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
@@ -46,3 +46,42 @@ class RentalInDBBase(RentalBase):
 # --- Response model ---
 class RentalResponse(RentalInDBBase):
     pass
+
+
+# --- Batch end/confirm ---
+class RentalBatchRequest(BaseModel):
+    rental_ids: List[str]
+
+
+class RentalBatchResult(BaseModel):
+    rental_id: str
+    status: str
+    item_id: Optional[str] = None
+
+
+# --- History ---
+# active: not yet returned; ended: returned; confirmed: receipt confirmed by the owner
+HistoryStatus = Literal["active", "ended", "confirmed"]
+
+
+class RentalHistoryEntry(BaseModel):
+    id: str
+    renter_id: str
+    item_id: str
+    start_date: datetime
+    end_date: datetime
+    quantity: int
+    total_price: float
+    is_active: bool
+    owner_received: bool
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RentalHistoryPage(BaseModel):
+    items: List[RentalHistoryEntry]
+    # Pass back as `cursor` for the next page; None on the last page
+    next_cursor: Optional[str] = None
@@ -0,0 +1,21 @@
+# backend/app/schemas/rollup.py
+"""
+Pydantic schemas for owner dashboard rollups.
+Used for response serialization.
+"""
+
+from pydantic import BaseModel
+from datetime import date
+
+
+# --- Response model ---
+class ItemRollupResponse(BaseModel):
+    item_id: str
+    granularity: str
+    bucket_start: date
+    rentals_count: int
+    revenue: float
+    rented_unit_days: int
+    returns_count: int
+    confirmations_count: int
+    utilization: float  # percent of the item's stock-days that were rented
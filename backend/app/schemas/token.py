@@ -0,0 +1,20 @@
+# backend/app/schemas/token.py
+"""
+Pydantic schemas for access and refresh tokens.
+Used for request validation and response serialization.
+"""
+
+from pydantic import BaseModel
+
+
+# --- Request ---
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+# --- Response model ---
+class TokenResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
@@ -4,21 +4,83 @@ FastAPI application entry point.
 Includes middleware, routers, and startup/shutdown events.
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError
 from .app.api.app_v1.app import api_router
-from .app.db.session import engine, Base
+from .app import crud
+from .app.core.config import settings
+from .app.core.revocation import revocations
+from .app.core.security import warm_up_hashing
+from .app.db.session import engine, warm_pool
+from .app.core.idempotency import IdempotencyMiddleware
+from .app.core.load_shedding import DeadlineExceeded, LoadSheddingMiddleware, deadline_expired
+
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema work happens here rather than at import, so importing the app
+    # (tests, tooling, forked workers) never touches the database.
+    from .app.db.migrations import check_schema_version, migrate
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+    # `python -m backend` does this once before forking its workers
+    if not getattr(app.state, "schema_checked", False):
+        if settings.auto_migrate:
+            migrate(engine)
+        else:
+            check_schema_version(engine)
+    warm_pool(settings.DB_POOL_WARM_CONNECTIONS)
+    warm_up_hashing()
+    revocations.start_sync(crud.token.load_revoked_since, settings.REVOCATION_SYNC_SECONDS)
+    yield
+    engine.dispose()
 
-app = FastAPI(title="Rental Gears API")
+
+app = FastAPI(title="Rental Gears API", lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",  # Vite dev server
     "http://127.0.0.1:5173",
 ]
 
+# Profile requests carrying an operator token (innermost, so queue time is excluded)
+if settings.PROFILER_ENABLED:
+    from .app.core.profiling import ProfilingMiddleware
+
+    app.add_middleware(ProfilingMiddleware)
+
+# Replay retried rental mutations carrying an Idempotency-Key
+app.add_middleware(IdempotencyMiddleware, path_prefixes=["/api/v1/rentals"])
+
+# Shed load under overload, preferring logins, token refreshes and rental
+# creation over browsing
+app.add_middleware(
+    LoadSheddingMiddleware,
+    priorities=[
+        ("POST", "/api/v1/auth/login", 0),
+        ("POST", "/api/v1/auth/refresh", 0),
+        ("POST", "/api/v1/rentals", 0),
+        ("GET", "/api/v1/items", 2),
+    ],
+    exempt_prefixes=["/api/v1/events"],
+)
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=503, content={"detail": "Request deadline exceeded"})
+
+
+@app.exception_handler(OperationalError)
+async def statement_timeout_handler(request: Request, exc: OperationalError):
+    # Statements cancelled by the request deadline surface as driver errors
+    if deadline_expired():
+        return JSONResponse(status_code=503, content={"detail": "Request deadline exceeded"})
+    raise exc
 
 # CORS middleware
 app.add_middleware(
@@ -0,0 +1,14 @@
+# backend/tests/conftest.py
+"""
+Test configuration: a development environment on a throwaway database.
+
+Set before the app is imported, since settings are read once at import.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("ENV", "development")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='rental-gears-'), 'test.db')}"
+)
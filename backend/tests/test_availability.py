@@ -0,0 +1,90 @@
+# backend/tests/test_availability.py
+"""
+Concurrent rentals and holds on one item never book more than its stock,
+with holds in either store.
+"""
+
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import crud
+from backend.app.crud.hold import DatabaseHoldStore, HoldStore
+from backend.app.crud.rental import CRUDRental
+from backend.app.db.migrations import migrate
+from backend.app.models.item import Item
+from backend.app.models.user import User
+from backend.app.schemas.hold import HoldCreate
+from backend.app.schemas.rental import RentalCreate
+
+STOCK = 2
+ATTEMPTS = 12
+
+
+@pytest.mark.parametrize("store_class", [HoldStore, DatabaseHoldStore])
+def test_concurrent_bookings_do_not_oversell(tmp_path, monkeypatch, store_class):
+    engine = create_engine(f"sqlite:///{tmp_path / 'availability.db'}",
+                           connect_args={"check_same_thread": False})
+    migrate(engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        owner = User(email=f"{uuid.uuid4()}@example.com", hashed_password="x", is_owner=True)
+        db.add(owner)
+        db.flush()
+        item = Item(owner_id=owner.id, name="tent", price_per_day=10.0,
+                    total_stock=STOCK, available_stock=STOCK)
+        db.add(item)
+        db.commit()
+        item_id, renter_id = item.id, owner.id
+
+    # Widen the gap between reading availability and writing the booking
+    def slowed(read):
+        def slow_read(self, *args, **kwargs):
+            quantity = read(self, *args, **kwargs)
+            time.sleep(0.02)
+            return quantity
+        return slow_read
+
+    monkeypatch.setattr(CRUDRental, "get_rented_quantity", slowed(CRUDRental.get_rented_quantity))
+    monkeypatch.setattr(store_class, "held_quantity", slowed(store_class.held_quantity))
+    # The package re-exports `rental` objects over the module names
+    monkeypatch.setattr(sys.modules["backend.app.crud.rental"], "crud_hold", store_class())
+
+    booking = dict(item_id=item_id, start_date=datetime(2030, 6, 1),
+                   end_date=datetime(2030, 6, 3), quantity=1)
+    booked, errors = [], []
+    barrier = threading.Barrier(ATTEMPTS)
+
+    def book(attempt: int) -> None:
+        db = Session()
+        barrier.wait()
+        try:
+            if attempt == 0:
+                crud.rental.place_hold(db, obj_in=HoldCreate(**booking), renter_id=renter_id)
+            else:
+                crud.rental.create_with_availability_check(
+                    db, obj_in=RentalCreate(**booking), renter_id=renter_id
+                )
+            booked.append(attempt)
+        except ValueError:
+            pass
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=book, args=(attempt,)) for attempt in range(ATTEMPTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(booked) == STOCK
@@ -0,0 +1,138 @@
+# backend/tests/test_idempotency.py
+"""
+Idempotency-Key middleware against both stores: replays, conflicts,
+concurrent duplicates and responses that must not be stored.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.core.config import settings
+from backend.app.core.idempotency import (
+    DatabaseIdempotencyStore,
+    IdempotencyMiddleware,
+    IdempotencyStore,
+    REPLAYED_HEADER,
+)
+from backend.app.core.security import create_access_token
+from backend.app.db.migrations import migrate
+
+AUTH = {"Authorization": f"Bearer {create_access_token('renter-1')}"}
+
+
+@pytest.fixture(params=["memory", "database"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return IdempotencyStore(max_entries=100, ttl_seconds=60)
+    engine = create_engine(f"sqlite:///{tmp_path / 'idempotency.db'}",
+                           connect_args={"check_same_thread": False})
+    migrate(engine)
+    return DatabaseIdempotencyStore(
+        ttl_seconds=60, lease_seconds=60, poll_seconds=0.01,
+        session_factory=sessionmaker(bind=engine),
+    )
+
+
+@pytest.fixture
+def app(store):
+    app = FastAPI()
+    app.state.calls = 0
+    app.add_middleware(IdempotencyMiddleware, path_prefixes=["/rentals"], store=store)
+
+    @app.post("/rentals")
+    async def create(payload: dict):
+        app.state.calls += 1
+        return {"call": app.state.calls, **payload}
+
+    @app.post("/rentals/slow")
+    async def create_slowly(payload: dict):
+        app.state.calls += 1
+        await asyncio.sleep(0.3)
+        return {"call": app.state.calls}
+
+    @app.post("/rentals/flaky")
+    async def create_flaky(payload: dict):
+        app.state.calls += 1
+        if app.state.calls == 1:
+            return JSONResponse(status_code=503, content={"detail": "try again"})
+        return {"call": app.state.calls}
+
+    return app
+
+
+def _post(client, path, key, payload):
+    return client.post(path, json=payload, headers={**AUTH, "Idempotency-Key": key})
+
+
+def test_retry_replays_stored_response(app):
+    with TestClient(app) as client:
+        first = _post(client, "/rentals", "k1", {"item": "tent"})
+        retry = _post(client, "/rentals", "k1", {"item": "tent"})
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json() == {"call": 1, "item": "tent"}
+    assert retry.headers[REPLAYED_HEADER.decode()] == "true"
+    assert REPLAYED_HEADER.decode() not in first.headers
+    assert app.state.calls == 1
+
+
+def test_key_reused_with_different_body_is_rejected(app):
+    with TestClient(app) as client:
+        _post(client, "/rentals", "k1", {"item": "tent"})
+        response = _post(client, "/rentals", "k1", {"item": "stove"})
+
+    assert response.status_code == 422
+    assert app.state.calls == 1
+
+
+def test_overlong_key_is_rejected(app):
+    with TestClient(app) as client:
+        response = _post(client, "/rentals", "k" * 256, {"item": "tent"})
+
+    assert response.status_code == 400
+    assert app.state.calls == 0
+
+
+def test_concurrent_duplicate_waits_for_in_flight_request(app):
+    with TestClient(app) as client, ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(_post, client, "/rentals/slow", "k1", {})
+        time.sleep(0.1)
+        duplicate = pool.submit(_post, client, "/rentals/slow", "k1", {})
+        first, duplicate = first.result(), duplicate.result()
+
+    assert first.status_code == duplicate.status_code == 200
+    assert duplicate.json() == first.json()
+    assert duplicate.headers[REPLAYED_HEADER.decode()] == "true"
+    assert app.state.calls == 1
+
+
+def test_duplicate_gives_up_after_wait_timeout(app, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.05)
+    with TestClient(app) as client, ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(_post, client, "/rentals/slow", "k1", {})
+        time.sleep(0.1)
+        duplicate = pool.submit(_post, client, "/rentals/slow", "k1", {})
+        first, duplicate = first.result(), duplicate.result()
+
+    assert first.status_code == 200
+    assert duplicate.status_code == 409
+    assert app.state.calls == 1
+
+
+def test_server_errors_are_not_stored(app):
+    with TestClient(app) as client:
+        failed = _post(client, "/rentals/flaky", "k1", {})
+        retry = _post(client, "/rentals/flaky", "k1", {})
+
+    assert failed.status_code == 503
+    assert retry.status_code == 200
+    assert REPLAYED_HEADER.decode() not in retry.headers
+    assert app.state.calls == 2
@@ -0,0 +1,35 @@
+# backend/tests/test_query_plans.py
+"""
+Hot-path queries must reach their tables through an index. Each check runs
+the real CRUD call on a migrated, seeded SQLite database and fails on a full
+scan (or an automatic index, which is built from one) in EXPLAIN QUERY PLAN,
+or on a table read where only a covering index should be used.
+"""
+
+import pytest
+
+from backend.app.jobs.query_plans import (
+    CHECKS, explain, full_scans, seeded_database, table_reads,
+)
+
+SEED_RENTALS = 3000
+
+
+@pytest.fixture(scope="module")
+def plan_db():
+    with seeded_database(SEED_RENTALS) as (db, ids):
+        yield db, ids
+
+
+# CHECKS is ordered so the checks that write (archival) run last
+@pytest.mark.parametrize("check", CHECKS, ids=[check.name for check in CHECKS])
+def test_no_full_scan(plan_db, check):
+    db, ids = plan_db
+    plans = explain(db, check, ids)
+    assert plans, f"{check.name} issued no SELECT"
+    scans = [
+        f"{line}\n  in: {statement}"
+        for statement, plan in plans
+        for line in full_scans(plan, check.no_scan) + table_reads(plan, check.covering)
+    ]
+    assert not scans, "\n".join(scans)
@@ -0,0 +1,95 @@
+# backend/tests/test_rollups.py
+"""
+Owner dashboard rollups: a fixed number of rows per rental, and rented
+unit-days that match the rentals' own dates.
+"""
+
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import crud
+from backend.app.crud.rollup import bucket_start
+from backend.app.db.migrations import migrate
+from backend.app.models.item import Item
+from backend.app.models.item_rollup import ItemRollup
+from backend.app.models.rental import Rental
+from backend.app.models.user import User
+
+OWNER = "owner-1"
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    migrate(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=OWNER, email="owner@example.com", hashed_password="x", is_owner=True))
+    for index in range(3):
+        db.add(Item(id=f"item-{index}", owner_id=OWNER, name="tent", price_per_day=10.0,
+                    total_stock=50, available_stock=50))
+    db.commit()
+    return db
+
+
+def test_long_rental_writes_a_fixed_number_of_rows(tmp_path):
+    db = _session(tmp_path)
+    rental = Rental(id="r1", renter_id=OWNER, item_id="item-0", quantity=2, total_price=1.0,
+                    start_date=datetime(2030, 1, 1), end_date=datetime(2030, 12, 31))
+    db.add(rental)
+    db.flush()
+    crud.rollup.record_created(db, rental)
+    crud.rollup.record_ended(db, rental, at=datetime(2030, 6, 30))
+    db.commit()
+
+    # Start day, early-return day and the two ends of the span; plus week rows
+    assert db.query(ItemRollup).filter(ItemRollup.granularity == "day").count() <= 4
+    assert db.query(ItemRollup).filter(ItemRollup.granularity == "week").count() <= 2
+
+    rows = crud.rollup.get_owner_dashboard(db, owner_id=OWNER, granularity="week",
+                                          start_date=date(2030, 3, 4), end_date=date(2030, 3, 10))
+    assert [(row["bucket_start"], row["rented_unit_days"], row["utilization"]) for row in rows] == [
+        (date(2030, 3, 4), 14, 4.0)
+    ]
+
+
+def test_dashboard_matches_rental_dates(tmp_path):
+    db = _session(tmp_path)
+    rng = random.Random(7)
+    start = datetime(2030, 1, 1)
+    expected = defaultdict(int)
+    for index in range(150):
+        first = start + timedelta(days=rng.randint(0, 200), hours=rng.randint(0, 23))
+        rental = Rental(id=str(index), renter_id=OWNER, item_id=f"item-{index % 3}",
+                        start_date=first, end_date=first + timedelta(days=rng.randint(0, 60)),
+                        quantity=rng.randint(1, 3), total_price=5.0, is_active=True)
+        last = rental.end_date.date()
+        if rng.random() < 0.5:
+            rental.is_active = False
+            rental.updated_at = first + timedelta(days=rng.randint(-3, 70))
+            last = min(last, rental.updated_at.date())
+        db.add(rental)
+        day = first.date()
+        while day <= last:
+            for granularity in ("day", "week"):
+                expected[(rental.item_id, granularity, bucket_start(day, granularity))] += (
+                    rental.quantity
+                )
+            day += timedelta(days=1)
+    db.commit()
+    crud.rollup.backfill(db)
+
+    for granularity, first_day, last_day in (
+        ("day", date(2030, 3, 1), date(2030, 5, 1)),
+        ("week", date(2030, 1, 1), date(2030, 12, 31)),
+    ):
+        rows = crud.rollup.get_owner_dashboard(
+            db, owner_id=OWNER, granularity=granularity, start_date=first_day, end_date=last_day
+        )
+        got = {(row["item_id"], granularity, row["bucket_start"]): row["rented_unit_days"]
+               for row in rows if row["rented_unit_days"]}
+        want = {key: units for key, units in expected.items()
+                if key[1] == granularity and bucket_start(first_day, granularity) <= key[2] <= last_day}
+        assert got == want
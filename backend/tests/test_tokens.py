@@ -0,0 +1,51 @@
+# backend/tests/test_tokens.py
+"""
+Refresh-token rotation: spent tokens stay in the database only, and reusing
+one revokes its session in every worker's mirror.
+"""
+
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import crud
+from backend.app.core.revocation import revocations
+from backend.app.db.migrations import migrate
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tokens.db'}")
+    migrate(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _refresh_payload(fam: str) -> dict:
+    return {"jti": str(uuid.uuid4()), "fam": fam, "exp": int(time.time()) + 3600}
+
+
+def test_spent_refresh_tokens_are_not_mirrored(tmp_path):
+    db = _session(tmp_path)
+    fam = str(uuid.uuid4())
+    first, second = _refresh_payload(fam), _refresh_payload(fam)
+
+    assert crud.token.rotate(db, first)
+    assert crud.token.rotate(db, second)
+    assert not revocations.is_revoked(first["jti"], second["jti"], fam)
+    assert crud.token.get_revoked_since(db, None) == []
+    assert crud.token.get_revoked_since(db, datetime(2000, 1, 1)) == []
+
+
+def test_reuse_revokes_the_session(tmp_path):
+    db = _session(tmp_path)
+    fam = str(uuid.uuid4())
+    payload = _refresh_payload(fam)
+
+    assert crud.token.rotate(db, payload)
+    assert not crud.token.rotate(db, payload)
+    assert revocations.is_revoked(fam)
+    assert [row[0] for row in crud.token.get_revoked_since(db, None)] == [fam]
+    # The session stays revoked for the tokens issued after the spent one
+    assert not crud.token.rotate(db, _refresh_payload(fam))